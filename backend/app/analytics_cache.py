@@ -0,0 +1,276 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Analytics response cache configuration
+ANALYTICS_CACHE_BACKEND = os.getenv("ANALYTICS_CACHE_BACKEND", "memory")  # memory, redis or none
+ANALYTICS_CACHE_TTL = float(os.getenv("ANALYTICS_CACHE_TTL", "5"))
+ANALYTICS_CACHE_SIZE = int(os.getenv("ANALYTICS_CACHE_SIZE", "1024"))
+ANALYTICS_CACHE_REDIS_URL = os.getenv("ANALYTICS_CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+# Tags an entry depends on; writes invalidate the tags they touch
+OVERVIEW_TAG = "overview"
+
+def meeting_tag(meeting_id: int) -> str:
+    return f"meeting:{meeting_id}"
+
+def user_tag(user_id: int) -> str:
+    return f"user:{user_id}"
+
+def etag_for(body: bytes) -> str:
+    """Strong ETag derived from the response body"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+class MemoryBackend:
+    """
+    In-process LRU with per-entry TTL. A tag index maps each tag to the keys
+    that depend on it so invalidation deletes exactly those entries.
+    Invalidation also bumps a generation counter per tag (hashed into a fixed
+    number of slots, so memory stays bounded); set() drops a result whose
+    generation moved while it was being computed.
+    """
+
+    blocking = False
+    generation_slots = 4096
+
+    def __init__(self, capacity: int = ANALYTICS_CACHE_SIZE):
+        self.capacity = capacity
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._tags: dict = {}
+        self._generations = [0] * self.generation_slots
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _generation(self, tags) -> tuple:
+        return (self._epoch, *(self._generations[hash(tag) % self.generation_slots] for tag in tags))
+
+    def generation(self, tags: Iterable[str]) -> tuple:
+        with self._lock:
+            return self._generation(tuple(tags))
+
+    def get(self, key: str, tags: Iterable[str] = (), generation=None) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, body, _ = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return body
+
+    def set(self, key: str, body: bytes, tags: Iterable[str], ttl: float, generation=None) -> bool:
+        tags = tuple(tags)
+        with self._lock:
+            if generation is not None and generation != self._generation(tags):
+                return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, body, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.capacity:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return True
+
+    def invalidate(self, tags: Iterable[str]):
+        with self._lock:
+            for tag in tags:
+                self._generations[hash(tag) % self.generation_slots] += 1
+                for key in self._tags.pop(tag, ()):
+                    self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._tags.clear()
+
+    def size(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+class RedisBackend:
+    """
+    Shared cache for multi-worker deployments. Each tag has a generation
+    counter that is part of the entry key, so invalidating a tag (INCR)
+    makes every dependent entry unreachable until its TTL removes it.
+    A result is stored under the generation read before computing it, so
+    one that raced an invalidation lands on a key nobody reads.
+    Works with any client exposing get/mget/set/incr/expire/pipeline,
+    e.g. redis.Redis or fakeredis.FakeRedis for local runs.
+    """
+
+    # Every call is a network round trip
+    blocking = True
+
+    def __init__(self, client, prefix: str = "analytics"):
+        self.client = client
+        self.prefix = prefix
+        self.evictions = 0
+
+    def _generation_keys(self, tags):
+        # The "*" tag is bumped by clear() and applies to every entry
+        return [f"{self.prefix}:gen:{tag}" for tag in ("*", *tags)]
+
+    def generation(self, tags: Iterable[str]) -> str:
+        generations = self.client.mget(self._generation_keys(tuple(tags)))
+        return ".".join(
+            (value.decode() if isinstance(value, bytes) else str(value)) if value is not None else "0"
+            for value in generations
+        )
+
+    def _entry_key(self, key: str, tags, generation=None) -> str:
+        if generation is None:
+            generation = self.generation(tags)
+        return f"{self.prefix}:{key}:{generation}"
+
+    def get(self, key: str, tags: Iterable[str] = (), generation=None) -> Optional[bytes]:
+        return self.client.get(self._entry_key(key, tuple(tags), generation))
+
+    def set(self, key: str, body: bytes, tags: Iterable[str], ttl: float, generation=None) -> bool:
+        self.client.set(self._entry_key(key, tuple(tags), generation), body, px=int(ttl * 1000))
+        return True
+
+    def invalidate(self, tags: Iterable[str]):
+        pipe = self.client.pipeline()
+        for generation_key in self._generation_keys(tags)[1:]:
+            pipe.incr(generation_key)
+            # Outlive every entry keyed on the old generation
+            pipe.expire(generation_key, int(ANALYTICS_CACHE_TTL * 10) + 60)
+        pipe.execute()
+
+    def clear(self):
+        self.client.incr(f"{self.prefix}:gen:*")
+
+    def size(self) -> Optional[int]:
+        return None
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+class AnalyticsCache:
+    """
+    TTL cache of serialized analytics responses keyed by route and parameters.
+
+    Readers call lookup() before computing and pass the generation it returns
+    to set(), so a result computed across an invalidation is never stored.
+    With a blocking (network) backend, invalidations made on the event loop
+    (crud in async mode) run in the default executor instead of stalling it;
+    settle() waits for them so a process still reads its own writes.
+    """
+
+    def __init__(self, backend=None, ttl: float = ANALYTICS_CACHE_TTL, enabled: bool = True):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl = ttl
+        self.enabled = enabled and ttl > 0
+        self.blocking = self.enabled and self.backend.blocking
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.stale_writes = 0
+        self._pending: set = set()
+
+    def lookup(self, key: str, tags: Iterable[str] = ()) -> Tuple[Optional[bytes], object]:
+        """Return the cached body for a key (or None) and the tags' current generation"""
+        if not self.enabled:
+            return None, None
+        tags = tuple(tags)
+        generation = self.backend.generation(tags)
+        body = self.backend.get(key, tags, generation)
+        if body is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return body, generation
+
+    def set(self, key: str, body: bytes, tags: Iterable[str] = (), generation=None):
+        """Store a body unless its tags were invalidated since `generation` was read"""
+        if self.enabled and not self.backend.set(key, body, tags, self.ttl, generation):
+            self.stale_writes += 1
+
+    def invalidate(self, meeting_ids: Iterable[int] = (), user_ids: Iterable[int] = ()):
+        """Drop entries for the given meetings and users, and the overview"""
+        if not self.enabled:
+            return
+        tags = [OVERVIEW_TAG]
+        tags.extend(meeting_tag(meeting_id) for meeting_id in set(meeting_ids))
+        tags.extend(user_tag(user_id) for user_id in set(user_ids))
+        self._dispatch(self.backend.invalidate, tags)
+        self.invalidations += 1
+
+    def clear(self):
+        self._dispatch(self.backend.clear)
+
+    async def settle(self):
+        """Wait for invalidations handed to the executor by this process"""
+        if self._pending:
+            await asyncio.wait(list(self._pending))
+
+    def _dispatch(self, func, *args):
+        loop = _running_loop() if self.blocking else None
+        if loop is None:
+            func(*args)
+            return
+        future = loop.run_in_executor(None, func, *args)
+        self._pending.add(future)
+        future.add_done_callback(self._finished)
+
+    def _finished(self, future):
+        self._pending.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("Analytics cache invalidation failed", exc_info=future.exception())
+
+    def stats(self) -> dict:
+        """Current cache counters"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "ttl": self.ttl,
+            "size": self.backend.size(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "stale_writes": self.stale_writes,
+            "evictions": self.backend.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+def _make_backend(name: str):
+    if name == "redis":
+        import redis
+        return RedisBackend(redis.Redis.from_url(ANALYTICS_CACHE_REDIS_URL))
+    return MemoryBackend()
+
+# Shared cache used by the analytics router and invalidated by crud writes
+analytics_cache = AnalyticsCache(
+    backend=_make_backend(ANALYTICS_CACHE_BACKEND),
+    enabled=ANALYTICS_CACHE_BACKEND != "none",
+)
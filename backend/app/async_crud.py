@@ -0,0 +1,138 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from . import crud, models
+from typing import List, Optional
+from datetime import datetime
+
+# Async counterparts of the crud functions used by the tracking and
+# analytics routers. Statements and parameters are shared with crud.
+
+async def run(db, crud_func, *args, **kwargs):
+    """
+    Call a crud function on either kind of session: for an AsyncSession its
+    async variant from ASYNC_VARIANTS, or the sync function through run_sync
+    when it has none; otherwise the sync function in the threadpool
+    """
+    if isinstance(db, AsyncSession):
+        async_func = ASYNC_VARIANTS.get(crud_func)
+        if async_func is None:
+            return await db.run_sync(crud_func, *args, **kwargs)
+        return await async_func(db, *args, **kwargs)
+    return await run_in_threadpool(crud_func, db, *args, **kwargs)
+
+# Lookups
+async def get_user(db: AsyncSession, user_id: int):
+    """Get user by ID"""
+    return await db.get(models.User, user_id)
+
+async def get_meeting(db: AsyncSession, meeting_id: int):
+    """Get meeting by ID"""
+    return await db.get(models.Meeting, meeting_id)
+
+async def get_meeting_recipients(db: AsyncSession, meeting_id: int, after: Optional[int] = None,
+                                 limit: Optional[int] = None):
+    """Get recipients for a meeting ordered by user ID, optionally one page at a time"""
+    result = await db.execute(crud._meeting_recipients_statement(meeting_id, after, limit))
+    return result.scalars().all()
+
+# Read tracking
+# The write paths keep counters and the read cache in step, so they run the
+# sync implementation on the AsyncSession's connection via run_sync; this
+# stays on the event loop without a worker thread.
+async def mark_recipient_read(db: AsyncSession, meeting_id: int, user_id: int,
+                              user_agent: str = None, ip_address: str = None) -> bool:
+    """Mark a recipient as read with a conditional UPDATE"""
+    return await db.run_sync(crud.mark_recipient_read, meeting_id, user_id, user_agent, ip_address)
+
+async def mark_recipients_read(db: AsyncSession, events: List[dict]):
+    """Mark a batch of recipients as read"""
+    await db.run_sync(crud.mark_recipients_read, events)
+
+async def record_email_open(db: AsyncSession, meeting_id: int, user_id: int,
+                            user_agent: str = None, ip_address: str = None) -> bool:
+    """Append an open event and mark the recipient read in one transaction"""
+    return await db.run_sync(crud.record_email_open, meeting_id, user_id, user_agent, ip_address)
+
+async def record_email_opens(db: AsyncSession, events: List[dict]):
+    """Append a batch of open events and mark their recipients read"""
+    await db.run_sync(crud.record_email_opens, events)
+
+# Analytics
+async def get_meeting_analytics(db: AsyncSession, meeting_id: int):
+    """Get analytics for a specific meeting"""
+    analytics = await get_meetings_analytics(db, [meeting_id])
+    return analytics[0] if analytics else None
+
+async def get_meetings_analytics(db: AsyncSession, meeting_ids: List[int]):
+    """Get analytics for many meetings in one GROUP BY query"""
+    result = await db.execute(crud._meeting_analytics_statement(meeting_ids))
+    return crud._build_meeting_analytics_rows(result.all())
+
+async def get_user_analytics(db: AsyncSession, user_id: int):
+    """Get analytics for a specific user"""
+    result = await db.execute(crud._user_analytics_statement(user_id))
+    row = result.first()
+    if not row:
+        return None
+    return crud._build_user_analytics(row, crud._row_counts(row))
+
+async def get_meeting_counter_analytics(db: AsyncSession, meeting_id: int):
+    """Get analytics for a meeting from its counter row"""
+    meeting = await get_meeting(db, meeting_id)
+    if not meeting:
+        return None
+    counter = await db.get(models.MeetingCounter, meeting_id)
+    return crud._build_meeting_analytics(meeting_id, meeting.title, crud._counter_values(counter))
+
+async def get_user_counter_analytics(db: AsyncSession, user_id: int):
+    """Get analytics for a user from their counter row"""
+    user = await get_user(db, user_id)
+    if not user:
+        return None
+    counter = await db.get(models.UserCounter, user_id)
+    return crud._build_user_analytics(user, crud._counter_values(counter))
+
+async def get_overview_analytics(db: AsyncSession):
+    """Get overview analytics in a single query"""
+    result = await db.execute(crud._overview_statement())
+    return crud._build_overview_analytics(result.one())
+
+async def get_meeting_open_analytics(db: AsyncSession, meeting_id: int):
+    """Get repeat-open analytics for a meeting from the rollup tables"""
+    summary = await db.get(models.EmailOpenSummary, meeting_id)
+    result = await db.execute(
+        select(models.EmailOpenDaily)
+        .where(models.EmailOpenDaily.meetingId == meeting_id)
+        .order_by(models.EmailOpenDaily.open_date)
+    )
+    return crud._build_open_analytics(meeting_id, summary, result.scalars().all())
+
+async def get_read_timeline(db: AsyncSession, meeting_id: Optional[int] = None, granularity: str = "hour",
+                            start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """Get reads per time bucket and time-to-open for a meeting, or for all meetings"""
+    timeline, distribution = crud._read_timeline_statements(
+        db.get_bind().dialect.name, meeting_id, granularity, start, end
+    )
+    timeline_rows = (await db.execute(timeline)).all()
+    distribution_rows = (await db.execute(distribution)).all()
+    return crud._build_read_timeline(meeting_id, granularity, start, end, timeline_rows, distribution_rows)
+
+# crud function -> async variant, used by run()
+ASYNC_VARIANTS = {
+    crud.get_user: get_user,
+    crud.get_meeting: get_meeting,
+    crud.get_meeting_recipients: get_meeting_recipients,
+    crud.mark_recipient_read: mark_recipient_read,
+    crud.mark_recipients_read: mark_recipients_read,
+    crud.record_email_open: record_email_open,
+    crud.record_email_opens: record_email_opens,
+    crud.get_meeting_analytics: get_meeting_analytics,
+    crud.get_meetings_analytics: get_meetings_analytics,
+    crud.get_user_analytics: get_user_analytics,
+    crud.get_meeting_counter_analytics: get_meeting_counter_analytics,
+    crud.get_user_counter_analytics: get_user_counter_analytics,
+    crud.get_overview_analytics: get_overview_analytics,
+    crud.get_meeting_open_analytics: get_meeting_open_analytics,
+    crud.get_read_timeline: get_read_timeline,
+}
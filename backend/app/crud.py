@@ -1,8 +1,13 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import func, desc, select, update, insert, delete, case, bindparam, literal, tuple_, exists
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from collections import defaultdict
 from . import models, schemas
+from .read_cache import read_cache
+from .analytics_cache import analytics_cache
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 
 # User CRUD operations
 def get_user(db: Session, user_id: int):
@@ -13,9 +18,14 @@ def get_user_by_email(db: Session, email: str):
     """Get user by email"""
     return db.query(models.User).filter(models.User.email == email).first()
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    """Get list of users"""
-    return db.query(models.User).offset(skip).limit(limit).all()
+def get_users(db: Session, skip: int = 0, limit: int = 100, after: Optional[int] = None):
+    """Get list of users ordered by ID, starting after the given ID when paging by cursor"""
+    query = db.query(models.User).order_by(models.User.userId)
+    if after is not None:
+        query = query.filter(models.User.userId > after)
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit).all()
 
 def create_user(db: Session, user: schemas.UserCreate):
     """Create new user"""
@@ -23,8 +33,46 @@ def create_user(db: Session, user: schemas.UserCreate):
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    analytics_cache.invalidate()
     return db_user
 
+def create_users_bulk(db: Session, users: List[schemas.UserCreate]):
+    """
+    Insert many users in one transaction with ON CONFLICT (email) DO NOTHING.
+    Returns one UserBulkResult per input row, in input order.
+    """
+    if not users:
+        return []
+    User = models.User
+    stmt = _dialect_insert(db)(User.__table__).on_conflict_do_nothing(
+        index_elements=["email"]
+    ).returning(User.__table__.c.userId, User.__table__.c.email)
+    created = dict(
+        (email, user_id)
+        for user_id, email in db.execute(stmt, [{"name": u.name, "email": u.email} for u in users])
+    )
+    existing_emails = {u.email for u in users} - created.keys()
+    existing = dict(
+        (email, user_id)
+        for email, user_id in db.query(User.email, User.userId).filter(User.email.in_(existing_emails))
+    ) if existing_emails else {}
+    db.commit()
+    if created:
+        analytics_cache.invalidate()
+    
+    results = []
+    seen = set()
+    for index, user in enumerate(users):
+        is_new = user.email in created and user.email not in seen
+        seen.add(user.email)
+        results.append(schemas.UserBulkResult(
+            index=index,
+            email=user.email,
+            status=schemas.BulkStatus.CREATED if is_new else schemas.BulkStatus.EXISTS,
+            userId=created.get(user.email) or existing.get(user.email)
+        ))
+    return results
+
 def update_user(db: Session, user_id: int, user_update: schemas.UserUpdate):
     """Update user"""
     db_user = get_user(db, user_id)
@@ -37,6 +85,7 @@ def update_user(db: Session, user_id: int, user_update: schemas.UserUpdate):
     
     db.commit()
     db.refresh(db_user)
+    analytics_cache.invalidate(user_ids=[user_id])
     return db_user
 
 def delete_user(db: Session, user_id: int):
@@ -45,6 +94,7 @@ def delete_user(db: Session, user_id: int):
     if db_user:
         db.delete(db_user)
         db.commit()
+        analytics_cache.invalidate(user_ids=[user_id])
     return db_user
 
 # Meeting CRUD operations
@@ -52,9 +102,14 @@ def get_meeting(db: Session, meeting_id: int):
     """Get meeting by ID"""
     return db.query(models.Meeting).filter(models.Meeting.meetingId == meeting_id).first()
 
-def get_meetings(db: Session, skip: int = 0, limit: int = 100):
-    """Get list of meetings"""
-    return db.query(models.Meeting).offset(skip).limit(limit).all()
+def get_meetings(db: Session, skip: int = 0, limit: int = 100, after: Optional[int] = None):
+    """Get list of meetings ordered by ID, starting after the given ID when paging by cursor"""
+    query = db.query(models.Meeting).order_by(models.Meeting.meetingId)
+    if after is not None:
+        query = query.filter(models.Meeting.meetingId > after)
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit).all()
 
 def create_meeting(db: Session, meeting: schemas.MeetingCreate):
     """Create new meeting"""
@@ -62,6 +117,7 @@ def create_meeting(db: Session, meeting: schemas.MeetingCreate):
     db.add(db_meeting)
     db.commit()
     db.refresh(db_meeting)
+    analytics_cache.invalidate()
     return db_meeting
 
 def update_meeting(db: Session, meeting_id: int, meeting_update: schemas.MeetingUpdate):
@@ -76,6 +132,7 @@ def update_meeting(db: Session, meeting_id: int, meeting_update: schemas.Meeting
     
     db.commit()
     db.refresh(db_meeting)
+    analytics_cache.invalidate(meeting_ids=[meeting_id])
     return db_meeting
 
 def delete_meeting(db: Session, meeting_id: int):
@@ -84,6 +141,7 @@ def delete_meeting(db: Session, meeting_id: int):
     if db_meeting:
         db.delete(db_meeting)
         db.commit()
+        analytics_cache.invalidate(meeting_ids=[meeting_id])
     return db_meeting
 
 # Sender CRUD operations
@@ -107,7 +165,12 @@ def create_sender(db: Session, sender: schemas.SenderCreate):
     
     db_sender = models.Sender(meetingId=sender.meetingId, userId=sender.userId)
     db.add(db_sender)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # Lost a race with a concurrent insert of the same pair
+        db.rollback()
+        return get_sender(db, sender.meetingId, sender.userId)
     db.refresh(db_sender)
     return db_sender
 
@@ -127,9 +190,66 @@ def get_recipient(db: Session, meeting_id: int, user_id: int):
         models.Recipient.userId == user_id
     ).first()
 
-def get_meeting_recipients(db: Session, meeting_id: int):
-    """Get all recipients for a meeting"""
-    return db.query(models.Recipient).filter(models.Recipient.meetingId == meeting_id).all()
+def _meeting_recipients_statement(meeting_id: int, after: Optional[int] = None,
+                                  limit: Optional[int] = None):
+    # Ordered by userId so pages are range scans on ux_recipient_meeting_user
+    stmt = select(models.Recipient).where(
+        models.Recipient.meetingId == meeting_id
+    ).order_by(models.Recipient.userId)
+    if after is not None:
+        stmt = stmt.where(models.Recipient.userId > after)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+def get_meeting_recipients(db: Session, meeting_id: int, after: Optional[int] = None,
+                           limit: Optional[int] = None):
+    """Get recipients for a meeting ordered by user ID, optionally one page at a time"""
+    return db.execute(_meeting_recipients_statement(meeting_id, after, limit)).scalars().all()
+
+def stream_meeting_recipients(db: Session, meeting_id: int, batch_size: int = 1000):
+    """Stream a meeting's recipient status rows from a server-side cursor"""
+    Recipient = models.Recipient
+    stmt = select(
+        Recipient.userId,
+        models.User.email,
+        models.User.name,
+        Recipient.status,
+        Recipient.read_at,
+        Recipient.user_agent,
+        Recipient.ip_address,
+        Recipient.created_at,
+        Recipient.updated_at,
+    ).join(
+        models.User, models.User.userId == Recipient.userId
+    ).where(
+        Recipient.meetingId == meeting_id
+    ).order_by(Recipient.userId).execution_options(stream_results=True, yield_per=batch_size)
+    return db.execute(stmt)
+
+def get_meeting_mailing_list(db: Session, meeting_id: int, statuses: Optional[List[str]] = None,
+                             after: Optional[int] = None, limit: Optional[int] = None):
+    """
+    Get (userId, name, email) for a meeting's recipients, optionally only in
+    the given statuses, ordered by userId starting after the given cursor
+    """
+    Recipient = models.Recipient
+    stmt = select(
+        Recipient.userId,
+        models.User.name,
+        models.User.email,
+    ).join(
+        models.User, models.User.userId == Recipient.userId
+    ).where(
+        Recipient.meetingId == meeting_id
+    ).order_by(Recipient.userId)
+    if statuses:
+        stmt = stmt.where(Recipient.status.in_(statuses))
+    if after is not None:
+        stmt = stmt.where(Recipient.userId > after)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return db.execute(stmt).all()
 
 def get_user_recipients(db: Session, user_id: int):
     """Get all recipient records for a user"""
@@ -148,75 +268,670 @@ def create_recipient(db: Session, recipient: schemas.RecipientCreate):
         status="EMAIL_CREATED"
     )
     db.add(db_recipient)
-    db.commit()
+    _apply_counter_transitions(db, [(recipient.meetingId, recipient.userId, None, "EMAIL_CREATED")])
+    try:
+        db.commit()
+    except IntegrityError:
+        # Lost a race with a concurrent insert of the same pair
+        db.rollback()
+        return get_recipient(db, recipient.meetingId, recipient.userId)
     db.refresh(db_recipient)
+    read_cache.discard(recipient.meetingId, recipient.userId)
+    _invalidate_analytics([(recipient.meetingId, recipient.userId)])
     return db_recipient
 
+def create_recipients_bulk(db: Session, recipients: List[schemas.RecipientCreate]):
+    """
+    Insert many recipients in one transaction with
+    ON CONFLICT (meetingId, userId) DO NOTHING.
+    Returns one RecipientBulkResult per input row, in input order.
+    """
+    if not recipients:
+        return []
+    Recipient = models.Recipient
+    meeting_ids = {r.meetingId for r in recipients}
+    user_ids = {r.userId for r in recipients}
+    known_meetings = set(db.execute(
+        select(models.Meeting.meetingId).where(models.Meeting.meetingId.in_(meeting_ids))
+    ).scalars())
+    known_users = set(db.execute(
+        select(models.User.userId).where(models.User.userId.in_(user_ids))
+    ).scalars())
+    
+    valid_pairs = list(dict.fromkeys(
+        (r.meetingId, r.userId) for r in recipients
+        if r.meetingId in known_meetings and r.userId in known_users
+    ))
+    created = {}
+    if valid_pairs:
+        table = Recipient.__table__
+        stmt = _dialect_insert(db)(table).on_conflict_do_nothing(
+            index_elements=["meetingId", "userId"]
+        ).returning(table.c.id, table.c.meetingId, table.c.userId)
+        created = {
+            (meeting_id, user_id): recipient_id
+            for recipient_id, meeting_id, user_id in db.execute(stmt, [
+                {"meetingId": meeting_id, "userId": user_id, "status": "EMAIL_CREATED"}
+                for meeting_id, user_id in valid_pairs
+            ])
+        }
+    existing_pairs = [pair for pair in valid_pairs if pair not in created]
+    existing = {
+        (meeting_id, user_id): recipient_id
+        for recipient_id, meeting_id, user_id in db.query(
+            Recipient.id, Recipient.meetingId, Recipient.userId
+        ).filter(tuple_(Recipient.meetingId, Recipient.userId).in_(existing_pairs))
+    } if existing_pairs else {}
+    
+    _apply_counter_transitions(db, [
+        (meeting_id, user_id, None, "EMAIL_CREATED") for meeting_id, user_id in created
+    ])
+    db.commit()
+    for meeting_id, user_id in created:
+        read_cache.discard(meeting_id, user_id)
+    if created:
+        _invalidate_analytics(created)
+    
+    results = []
+    seen = set()
+    for index, recipient in enumerate(recipients):
+        pair = (recipient.meetingId, recipient.userId)
+        if recipient.meetingId not in known_meetings:
+            status = schemas.BulkStatus.MEETING_NOT_FOUND
+        elif recipient.userId not in known_users:
+            status = schemas.BulkStatus.USER_NOT_FOUND
+        elif pair in created and pair not in seen:
+            status = schemas.BulkStatus.CREATED
+        else:
+            status = schemas.BulkStatus.EXISTS
+        seen.add(pair)
+        results.append(schemas.RecipientBulkResult(
+            index=index,
+            meetingId=recipient.meetingId,
+            userId=recipient.userId,
+            status=status,
+            id=created.get(pair) or existing.get(pair)
+        ))
+    return results
+
 def update_recipient_status(db: Session, meeting_id: int, user_id: int, 
                           status: str, user_agent: str = None, ip_address: str = None):
-    """Update recipient status"""
-    db_recipient = get_recipient(db, meeting_id, user_id)
-    if not db_recipient:
-        return None
-    
-    db_recipient.status = status
-    if status == "EMAIL_READ" and db_recipient.read_at is None:
-        db_recipient.read_at = func.now()
-        db_recipient.user_agent = user_agent
-        db_recipient.ip_address = ip_address
+    """
+    Update recipient status. The UPDATE only applies while the status is
+    still the one read, so concurrent updates cannot both apply the same
+    counter transition; a lost race re-reads the row and tries again.
+    """
+    recipient = models.Recipient.__table__
+    while True:
+        db_recipient = get_recipient(db, meeting_id, user_id)
+        if not db_recipient:
+            return None
+        old_status = db_recipient.status
+        values = {"status": status}
+        if status == "EMAIL_READ":
+            values.update(
+                read_at=func.coalesce(recipient.c.read_at, func.now()),
+                user_agent=case((recipient.c.read_at.is_(None), user_agent), else_=recipient.c.user_agent),
+                ip_address=case((recipient.c.read_at.is_(None), ip_address), else_=recipient.c.ip_address)
+            )
+        result = db.execute(
+            update(recipient)
+            .where(recipient.c.id == db_recipient.id, recipient.c.status == old_status)
+            .values(**values)
+        )
+        if result.rowcount:
+            break
+        db.rollback()
     
+    _apply_counter_transitions(db, [(meeting_id, user_id, old_status, status)])
     db.commit()
     db.refresh(db_recipient)
+    if status == "EMAIL_READ":
+        read_cache.add(meeting_id, user_id)
+    else:
+        read_cache.discard(meeting_id, user_id)
+    _invalidate_analytics([(meeting_id, user_id)])
     return db_recipient
 
+# Statuses a recipient can be read from
+READ_FROM_STATUSES = ("EMAIL_CREATED", "EMAIL_SENT")
+
+def _mark_read_values(recipient, read_at, user_agent, ip_address):
+    """SET clause shared by the mark-read UPDATEs; the first read keeps its time and client"""
+    return {
+        "status": "EMAIL_READ",
+        "read_at": func.coalesce(recipient.c.read_at, read_at),
+        "user_agent": case(
+            (recipient.c.read_at.is_(None), user_agent),
+            else_=recipient.c.user_agent
+        ),
+        "ip_address": case(
+            (recipient.c.read_at.is_(None), ip_address),
+            else_=recipient.c.ip_address
+        )
+    }
+
+def _mark_read_batch_statement(pending: dict):
+    """
+    One UPDATE flipping each pending recipient from the status the batch
+    read to EMAIL_READ. Per-row values are CASE expressions on the row id,
+    and RETURNING names the rows that actually changed, so the caller does
+    not depend on the driver reporting executemany rowcounts.
+    """
+    recipient = models.Recipient.__table__
+
+    def per_row(name, type_):
+        # Typed like the column so SQLite stores the same naive UTC text as
+        # opened_at and func.now(), not an ISO string with an offset
+        return case(
+            {row["id"]: literal(row[name], type_) for row in pending.values()},
+            value=recipient.c.id
+        )
+
+    return (
+        update(recipient)
+        .where(
+            recipient.c.id.in_([row["id"] for row in pending.values()]),
+            recipient.c.status == per_row("from_status", recipient.c.status.type)
+        )
+        .values(**_mark_read_values(
+            recipient,
+            per_row("b_read_at", recipient.c.read_at.type),
+            per_row("b_user_agent", recipient.c.user_agent.type),
+            per_row("b_ip_address", recipient.c.ip_address.type)
+        ))
+        .returning(recipient.c.id)
+    )
+
+def _mark_read_returning_statement():
+    """
+    Single UPDATE that flips a recipient from any readable status to
+    EMAIL_READ and returns the status it had. The materialized CTE captures
+    (and on PostgreSQL locks) the row before the update, since RETURNING
+    only sees the new values.
+    """
+    recipient = models.Recipient.__table__
+    prior = (
+        select(recipient.c.id, recipient.c.status)
+        .where(
+            recipient.c.meetingId == bindparam("b_meeting_id"),
+            recipient.c.userId == bindparam("b_user_id"),
+            recipient.c.status.in_(READ_FROM_STATUSES)
+        )
+        .with_for_update()
+        .cte("prior")
+        .prefix_with("MATERIALIZED")
+    )
+    return (
+        update(recipient)
+        .where(
+            recipient.c.id.in_(select(prior.c.id)),
+            recipient.c.status.in_(READ_FROM_STATUSES)
+        )
+        .values(**_mark_read_values(
+            recipient,
+            bindparam("b_read_at", type_=recipient.c.read_at.type),
+            bindparam("b_user_agent"),
+            bindparam("b_ip_address")
+        ))
+        # (meetingId, userId) is unique, so prior holds at most this row
+        .returning(select(prior.c.status).scalar_subquery())
+    )
+
+def _mark_read_params(meeting_id: int, user_id: int, read_at: Optional[datetime] = None,
+                      user_agent: str = None, ip_address: str = None):
+    return {
+        "b_meeting_id": meeting_id,
+        "b_user_id": user_id,
+        "b_read_at": read_at or datetime.now(timezone.utc),
+        "b_user_agent": user_agent,
+        "b_ip_address": ip_address
+    }
+
+def _mark_read_one(db: Session, params: dict) -> bool:
+    """
+    Run the single conditional UPDATE; the prior status it returns is the
+    counter transition, so counters are updated without a SELECT
+    """
+    from_status = db.execute(_mark_read_returning_statement(), params).scalar()
+    if from_status is None:
+        return False
+    _apply_counter_transitions(
+        db, [(params["b_meeting_id"], params["b_user_id"], from_status, "EMAIL_READ")]
+    )
+    return True
+
+def mark_recipient_read(db: Session, meeting_id: int, user_id: int,
+                        user_agent: str = None, ip_address: str = None) -> bool:
+    """
+    Mark a recipient as read with a conditional UPDATE.
+    Returns True if this call was the first read, False if the recipient
+    was already read or does not exist.
+    """
+    first_read = _mark_read_one(
+        db, _mark_read_params(meeting_id, user_id, user_agent=user_agent, ip_address=ip_address)
+    )
+    db.commit()
+    if first_read:
+        read_cache.add(meeting_id, user_id)
+        _invalidate_analytics([(meeting_id, user_id)])
+    return first_read
+
+def _mark_read_batch_params(events: List[dict]):
+    return [
+        _mark_read_params(
+            event["meeting_id"],
+            event["user_id"],
+            read_at=event.get("read_at"),
+            user_agent=event.get("user_agent"),
+            ip_address=event.get("ip_address")
+        )
+        for event in events
+    ]
+
+def _mark_read_batch(db: Session, events: List[dict]):
+    """
+    Mark a batch of recipients read with one SELECT and one UPDATE ...
+    RETURNING. Counters move by the transitions of the returned rows; rows
+    whose status changed between the two are read again and retried.
+    Returns (pairs now known to be read, pairs this batch changed); pairs
+    without a recipient row are in neither.
+    """
+    Recipient = models.Recipient
+    params = {}
+    for p in _mark_read_batch_params(events):
+        # The first event of a pair wins, as it is the earliest read
+        params.setdefault((p["b_meeting_id"], p["b_user_id"]), p)
+    read_pairs, changed_pairs = set(), set()
+    
+    remaining = set(params)
+    while remaining:
+        pending = {}
+        for recipient_id, meeting_id, user_id, status in db.query(
+            Recipient.id, Recipient.meetingId, Recipient.userId, Recipient.status
+        ).filter(tuple_(Recipient.meetingId, Recipient.userId).in_(remaining)):
+            key = (meeting_id, user_id)
+            if status == "EMAIL_READ":
+                read_pairs.add(key)
+            else:
+                pending[key] = {**params[key], "id": recipient_id, "from_status": status}
+        if not pending:
+            break
+        
+        changed_ids = set(db.execute(_mark_read_batch_statement(pending)).scalars())
+        changed = {key for key, row in pending.items() if row["id"] in changed_ids}
+        _apply_counter_transitions(db, [
+            (meeting_id, user_id, pending[(meeting_id, user_id)]["from_status"], "EMAIL_READ")
+            for meeting_id, user_id in changed
+        ])
+        changed_pairs |= changed
+        remaining = set(pending) - changed
+    return read_pairs | changed_pairs, changed_pairs
+
+def _cache_read_batch(read_pairs, changed_pairs):
+    # Only pairs with a recipient row are cached, so hits for unknown pairs
+    # (e.g. a scanner trying random IDs) cannot evict real entries
+    for meeting_id, user_id in read_pairs:
+        read_cache.add(meeting_id, user_id)
+    if changed_pairs:
+        _invalidate_analytics(changed_pairs)
+
+def mark_recipients_read(db: Session, events: List[dict]):
+    """Mark a batch of recipients as read"""
+    if not events:
+        return
+    read_pairs, changed_pairs = _mark_read_batch(db, events)
+    db.commit()
+    _cache_read_batch(read_pairs, changed_pairs)
+
 def delete_recipient(db: Session, meeting_id: int, user_id: int):
     """Delete recipient"""
     db_recipient = get_recipient(db, meeting_id, user_id)
     if db_recipient:
         db.delete(db_recipient)
+        _apply_counter_transitions(db, [(meeting_id, user_id, db_recipient.status, None)])
         db.commit()
+        read_cache.discard(meeting_id, user_id)
+        _invalidate_analytics([(meeting_id, user_id)])
     return db_recipient
 
-# Analytics operations
-def get_meeting_analytics(db: Session, meeting_id: int):
-    """Get analytics for a specific meeting"""
-    meeting = get_meeting(db, meeting_id)
-    if not meeting:
-        return None
+def _invalidate_analytics(pairs):
+    """Drop cached analytics for the meetings and users of changed recipients"""
+    analytics_cache.invalidate(
+        meeting_ids={meeting_id for meeting_id, _ in pairs},
+        user_ids={user_id for _, user_id in pairs}
+    )
+
+# Open event operations
+def _open_event_params(meeting_id: int, user_id: int, opened_at: Optional[datetime] = None,
+                       user_agent: str = None, ip_address: str = None):
+    opened_at = opened_at or datetime.now(timezone.utc)
+    return {
+        "meetingId": meeting_id,
+        "userId": user_id,
+        "opened_at": opened_at,
+        "open_date": opened_at.date(),
+        "user_agent": user_agent,
+        "ip_address": ip_address
+    }
+
+def _open_event_insert_statement():
+    """
+    INSERT ... SELECT of one open event that inserts nothing when the pair
+    has no recipient, so forged or stray hits never reach the event log
+    """
+    event = models.EmailOpenEvent.__table__
+    recipient = models.Recipient.__table__
+    columns = ["meetingId", "userId", "opened_at", "open_date", "user_agent", "ip_address"]
+    row = select(*(bindparam(name, type_=event.c[name].type) for name in columns)).where(
+        exists().where(
+            recipient.c.meetingId == bindparam("meetingId"),
+            recipient.c.userId == bindparam("userId")
+        )
+    )
+    return insert(event).from_select(columns, row)
+
+def record_email_open(db: Session, meeting_id: int, user_id: int,
+                      user_agent: str = None, ip_address: str = None) -> bool:
+    """Append an open event and mark the recipient read in one transaction"""
+    opened_at = datetime.now(timezone.utc)
+    db.execute(
+        _open_event_insert_statement(),
+        _open_event_params(meeting_id, user_id, opened_at, user_agent, ip_address)
+    )
+    first_read = _mark_read_one(
+        db, _mark_read_params(meeting_id, user_id, opened_at, user_agent, ip_address)
+    )
+    db.commit()
+    if first_read:
+        read_cache.add(meeting_id, user_id)
+        _invalidate_analytics([(meeting_id, user_id)])
+    return first_read
+
+def _open_event_batch_params(events: List[dict]):
+    return [
+        _open_event_params(
+            event["meeting_id"],
+            event["user_id"],
+            opened_at=event.get("read_at"),
+            user_agent=event.get("user_agent"),
+            ip_address=event.get("ip_address")
+        )
+        for event in events
+    ]
+
+def record_email_opens(db: Session, events: List[dict]):
+    """
+    Append a batch of open events and mark their recipients read. Events are
+    kept for recipients found by the batch lookup or known read by the cache.
+    """
+    if not events:
+        return
+    unread = [event for event in events if not event.get("already_read")]
+    read_pairs, changed_pairs = _mark_read_batch(db, unread) if unread else (set(), set())
+    known = read_pairs | changed_pairs
+    events = [
+        event for event in events
+        if event.get("already_read") or (event["meeting_id"], event["user_id"]) in known
+    ]
+    if events:
+        db.execute(insert(models.EmailOpenEvent.__table__), _open_event_batch_params(events))
+    db.commit()
+    _cache_read_batch(read_pairs, changed_pairs)
+
+# RollupState row of the open event rollup; seeded by migration 0003
+OPEN_EVENT_ROLLUP = "email_open_event"
+
+def _claim_rollup_state(db: Session, name: str) -> int:
+    """
+    Lock the rollup's high-water mark and return it. An UPDATE is the first
+    statement so the lock is taken on SQLite (the write lock) as well as
+    PostgreSQL (the row lock); a concurrent rollup waits instead of folding
+    the same events.
+    """
+    state = models.RollupState.__table__
+    last_event_id = db.execute(
+        update(state)
+        .where(state.c.name == name)
+        .values(last_event_id=state.c.last_event_id)
+        .returning(state.c.last_event_id)
+    ).scalar()
+    if last_event_id is None:
+        raise RuntimeError(f"Rollup state {name!r} is missing; run manage.py migrate")
+    return last_event_id
+
+def rollup_open_events(db: Session, name: str = OPEN_EVENT_ROLLUP) -> int:
+    """
+    Fold open events newer than the stored high-water mark into the daily
+    and per-meeting rollup tables. Only the new events are read: their
+    counts are added to the stored totals, and an opener is new when the
+    pair has no event at or below the mark. Returns the number of events
+    folded.
+    """
+    Event = models.EmailOpenEvent
+    last_event_id = _claim_rollup_state(db, name)
+
+    max_event_id, new_events = db.query(func.max(Event.id), func.count(Event.id)).filter(
+        Event.id > last_event_id
+    ).one()
+    if not new_events:
+        db.rollback()
+        return 0
+
+    is_new = (Event.id > last_event_id, Event.id <= max_event_id)
+    earlier = aliased(Event)
+
+    def new_openers(*same_partition):
+        # Users of the new events not seen in the partition before the mark
+        first_open = ~exists().where(
+            earlier.meetingId == Event.meetingId,
+            earlier.userId == Event.userId,
+            earlier.id <= last_event_id,
+            *same_partition
+        )
+        return func.count(func.distinct(case((first_open, Event.userId))))
+
+    daily_rows = db.query(
+        Event.meetingId,
+        Event.open_date,
+        func.count(Event.id),
+        new_openers(earlier.open_date == Event.open_date)
+    ).filter(*is_new).group_by(Event.meetingId, Event.open_date).all()
+    daily = {
+        (row.meetingId, row.open_date): row
+        for row in db.query(models.EmailOpenDaily).filter(
+            tuple_(models.EmailOpenDaily.meetingId, models.EmailOpenDaily.open_date).in_(
+                [(meeting_id, open_date) for meeting_id, open_date, _, _ in daily_rows]
+            )
+        )
+    }
+    for meeting_id, open_date, opens, unique_openers in daily_rows:
+        row = daily.get((meeting_id, open_date))
+        if row is None:
+            db.add(models.EmailOpenDaily(
+                meetingId=meeting_id,
+                open_date=open_date,
+                opens=opens,
+                unique_openers=unique_openers
+            ))
+        else:
+            row.opens += opens
+            row.unique_openers += unique_openers
+
+    summary_rows = db.query(
+        Event.meetingId,
+        func.count(Event.id),
+        new_openers(),
+        func.min(Event.opened_at),
+        func.max(Event.opened_at)
+    ).filter(*is_new).group_by(Event.meetingId).all()
+    meeting_ids = {meeting_id for meeting_id, *_ in summary_rows}
+    summaries = {
+        row.meetingId: row
+        for row in db.query(models.EmailOpenSummary).filter(models.EmailOpenSummary.meetingId.in_(meeting_ids))
+    }
+    for meeting_id, total_opens, unique_openers, first_open_at, last_open_at in summary_rows:
+        row = summaries.get(meeting_id)
+        if row is None:
+            db.add(models.EmailOpenSummary(
+                meetingId=meeting_id,
+                total_opens=total_opens,
+                unique_openers=unique_openers,
+                first_open_at=first_open_at,
+                last_open_at=last_open_at
+            ))
+        else:
+            row.total_opens += total_opens
+            row.unique_openers += unique_openers
+            row.first_open_at = min(filter(None, (row.first_open_at, first_open_at)), default=None)
+            row.last_open_at = max(filter(None, (row.last_open_at, last_open_at)), default=None)
+
+    state = models.RollupState.__table__
+    db.execute(update(state).where(state.c.name == name).values(last_event_id=max_event_id))
+    db.commit()
+    analytics_cache.invalidate(meeting_ids=meeting_ids)
+    return new_events
+
+def _build_open_analytics(meeting_id: int, summary, daily):
+    total_opens = summary.total_opens if summary else 0
+    unique_openers = summary.unique_openers if summary else 0
     
-    recipients = get_meeting_recipients(db, meeting_id)
-    total_recipients = len(recipients)
+    return schemas.MeetingOpenAnalytics(
+        meetingId=meeting_id,
+        total_opens=total_opens,
+        unique_openers=unique_openers,
+        repeat_opens=total_opens - unique_openers,
+        first_open_at=summary.first_open_at if summary else None,
+        last_open_at=summary.last_open_at if summary else None,
+        daily=[
+            schemas.DailyOpens(
+                date=row.open_date,
+                opens=row.opens,
+                unique_openers=row.unique_openers,
+                repeat_opens=row.opens - row.unique_openers
+            )
+            for row in daily
+        ]
+    )
+
+def get_meeting_open_analytics(db: Session, meeting_id: int):
+    """Get repeat-open analytics for a meeting from the rollup tables"""
+    summary = db.get(models.EmailOpenSummary, meeting_id)
+    daily = db.query(models.EmailOpenDaily).filter(
+        models.EmailOpenDaily.meetingId == meeting_id
+    ).order_by(models.EmailOpenDaily.open_date).all()
     
-    email_created_count = len([r for r in recipients if r.status == "EMAIL_CREATED"])
-    email_sent_count = len([r for r in recipients if r.status == "EMAIL_SENT"])
-    email_read_count = len([r for r in recipients if r.status == "EMAIL_READ"])
+    return _build_open_analytics(meeting_id, summary, daily)
+
+# Counter operations
+STATUS_COUNTER_COLUMNS = {
+    "EMAIL_CREATED": "created_count",
+    "EMAIL_SENT": "sent_count",
+    "EMAIL_READ": "read_count",
+}
+
+def _dialect_insert(db: Session):
+    """INSERT construct with ON CONFLICT support for the session's database"""
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        return postgresql.insert
+    if dialect_name == "sqlite":
+        return sqlite.insert
+    raise NotImplementedError(f"Upserts are not supported on {dialect_name}")
+
+def _apply_counter_transitions(db: Session, transitions):
+    """
+    Apply (meeting_id, user_id, old_status, new_status) transitions to the
+    counter tables inside the caller's transaction. None means no status.
+    """
+    meeting_deltas = defaultdict(lambda: dict.fromkeys(STATUS_COUNTER_COLUMNS.values(), 0))
+    user_deltas = defaultdict(lambda: dict.fromkeys(STATUS_COUNTER_COLUMNS.values(), 0))
+    for meeting_id, user_id, old_status, new_status in transitions:
+        if old_status == new_status:
+            continue
+        for deltas in (meeting_deltas[meeting_id], user_deltas[user_id]):
+            if old_status:
+                deltas[STATUS_COUNTER_COLUMNS[old_status]] -= 1
+            if new_status:
+                deltas[STATUS_COUNTER_COLUMNS[new_status]] += 1
     
+    dialect_insert = _dialect_insert(db)
+    for model, key_column, deltas in (
+        (models.MeetingCounter, "meetingId", meeting_deltas),
+        (models.UserCounter, "userId", user_deltas)
+    ):
+        if not deltas:
+            continue
+        table = model.__table__
+        stmt = dialect_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[key_column],
+            set_={
+                column: table.c[column] + stmt.excluded[column]
+                for column in STATUS_COUNTER_COLUMNS.values()
+            }
+        )
+        db.execute(stmt, [{key_column: key, **values} for key, values in deltas.items()])
+
+def _status_count_columns():
+    """Per-status conditional sums over the recipient table"""
+    return [
+        func.coalesce(func.sum(case((models.Recipient.status == status, 1), else_=0)), 0).label(column)
+        for status, column in STATUS_COUNTER_COLUMNS.items()
+    ]
+
+def _recount_counters(db: Session, meeting_ids=None, user_ids=None):
+    """Recompute counter rows from recipients; None recomputes every key"""
+    for model, key_column, keys in (
+        (models.MeetingCounter, "meetingId", meeting_ids),
+        (models.UserCounter, "userId", user_ids)
+    ):
+        table = model.__table__
+        key = getattr(models.Recipient, key_column)
+        delete_stmt = delete(table)
+        counts = select(key, *_status_count_columns()).group_by(key)
+        if keys is not None:
+            delete_stmt = delete_stmt.where(table.c[key_column].in_(keys))
+            counts = counts.where(key.in_(keys))
+        db.execute(delete_stmt)
+        db.execute(insert(table).from_select(
+            [key_column, *STATUS_COUNTER_COLUMNS.values()], counts
+        ))
+
+def rebuild_counters(db: Session):
+    """Recompute all meeting and user counters from the recipient table"""
+    _recount_counters(db)
+    db.commit()
+    analytics_cache.clear()
+
+def counters_need_rebuild(db: Session) -> bool:
+    """True when recipients exist but the counter tables were never populated"""
+    has_counters = db.query(models.MeetingCounter.meetingId).first() is not None
+    has_recipients = db.query(models.Recipient.id).first() is not None
+    return has_recipients and not has_counters
+
+def _build_meeting_analytics(meeting_id: int, meeting_title: str, counts: dict):
+    total_recipients = sum(counts.values())
+    email_read_count = counts.get("read_count", 0)
     read_percentage = (email_read_count / total_recipients * 100) if total_recipients > 0 else 0
     
     return schemas.MeetingAnalytics(
         meetingId=meeting_id,
-        meeting_title=meeting.title,
+        meeting_title=meeting_title,
         total_recipients=total_recipients,
-        email_created_count=email_created_count,
-        email_sent_count=email_sent_count,
+        email_created_count=counts.get("created_count", 0),
+        email_sent_count=counts.get("sent_count", 0),
         email_read_count=email_read_count,
         read_percentage=round(read_percentage, 2)
     )
 
-def get_user_analytics(db: Session, user_id: int):
-    """Get analytics for a specific user"""
-    user = get_user(db, user_id)
-    if not user:
-        return None
-    
-    recipients = get_user_recipients(db, user_id)
-    total_meetings_received = len(recipients)
-    total_meetings_read = len([r for r in recipients if r.status == "EMAIL_READ"])
-    
+def _build_user_analytics(user, counts: dict):
+    total_meetings_received = sum(counts.values())
+    total_meetings_read = counts.get("read_count", 0)
     read_percentage = (total_meetings_read / total_meetings_received * 100) if total_meetings_received > 0 else 0
     
     return schemas.UserAnalytics(
-        userId=user_id,
+        userId=user.userId,
         user_name=user.name,
         user_email=user.email,
         total_meetings_received=total_meetings_received,
@@ -224,19 +939,199 @@ def get_user_analytics(db: Session, user_id: int):
         read_percentage=round(read_percentage, 2)
     )
 
-def get_overview_analytics(db: Session):
-    """Get overview analytics"""
-    total_meetings = db.query(models.Meeting).count()
-    total_users = db.query(models.User).count()
-    total_recipients = db.query(models.Recipient).count()
-    total_reads = db.query(models.Recipient).filter(models.Recipient.status == "EMAIL_READ").count()
-    
-    overall_read_percentage = (total_reads / total_recipients * 100) if total_recipients > 0 else 0
+def _counter_values(counter) -> dict:
+    if counter is None:
+        return {}
+    return {column: getattr(counter, column) for column in STATUS_COUNTER_COLUMNS.values()}
+
+def get_meeting_counter_analytics(db: Session, meeting_id: int):
+    """Get analytics for a meeting from its counter row"""
+    meeting = get_meeting(db, meeting_id)
+    if not meeting:
+        return None
+    counter = db.get(models.MeetingCounter, meeting_id)
+    return _build_meeting_analytics(meeting_id, meeting.title, _counter_values(counter))
+
+def get_user_counter_analytics(db: Session, user_id: int):
+    """Get analytics for a user from their counter row"""
+    user = get_user(db, user_id)
+    if not user:
+        return None
+    counter = db.get(models.UserCounter, user_id)
+    return _build_user_analytics(user, _counter_values(counter))
+
+# Analytics operations
+# Counts are aggregated in SQL with conditional sums; no recipient rows are loaded.
+def _meeting_analytics_statement(meeting_ids):
+    Recipient = models.Recipient
+    return select(
+        models.Meeting.meetingId,
+        models.Meeting.title,
+        *_status_count_columns()
+    ).outerjoin(
+        Recipient, Recipient.meetingId == models.Meeting.meetingId
+    ).where(
+        models.Meeting.meetingId.in_(meeting_ids)
+    ).group_by(models.Meeting.meetingId, models.Meeting.title)
+
+def _user_analytics_statement(user_id: int):
+    Recipient = models.Recipient
+    return select(
+        models.User.userId,
+        models.User.name,
+        models.User.email,
+        *_status_count_columns()
+    ).outerjoin(
+        Recipient, Recipient.userId == models.User.userId
+    ).where(
+        models.User.userId == user_id
+    ).group_by(models.User.userId, models.User.name, models.User.email)
+
+def _overview_statement():
+    Recipient = models.Recipient
+    return select(
+        select(func.count()).select_from(models.Meeting).scalar_subquery().label("total_meetings"),
+        select(func.count()).select_from(models.User).scalar_subquery().label("total_users"),
+        func.count(Recipient.id).label("total_recipients"),
+        func.coalesce(func.sum(case((Recipient.status == "EMAIL_READ", 1), else_=0)), 0).label("total_reads")
+    ).select_from(Recipient)
+
+def _row_counts(row) -> dict:
+    return {column: row._mapping[column] for column in STATUS_COUNTER_COLUMNS.values()}
+
+def _build_meeting_analytics_rows(rows):
+    return [
+        _build_meeting_analytics(row.meetingId, row.title, _row_counts(row))
+        for row in rows
+    ]
+
+def _build_overview_analytics(row):
+    overall_read_percentage = (row.total_reads / row.total_recipients * 100) if row.total_recipients > 0 else 0
     
     return schemas.OverviewAnalytics(
-        total_meetings=total_meetings,
-        total_users=total_users,
-        total_recipients=total_recipients,
-        total_reads=total_reads,
+        total_meetings=row.total_meetings,
+        total_users=row.total_users,
+        total_recipients=row.total_recipients,
+        total_reads=row.total_reads,
         overall_read_percentage=round(overall_read_percentage, 2)
     )
+
+def get_meeting_analytics(db: Session, meeting_id: int):
+    """Get analytics for a specific meeting"""
+    analytics = get_meetings_analytics(db, [meeting_id])
+    return analytics[0] if analytics else None
+
+def get_meetings_analytics(db: Session, meeting_ids: List[int]):
+    """Get analytics for many meetings in one GROUP BY query; unknown IDs are skipped"""
+    rows = db.execute(_meeting_analytics_statement(meeting_ids)).all()
+    return _build_meeting_analytics_rows(rows)
+
+def get_user_analytics(db: Session, user_id: int):
+    """Get analytics for a specific user"""
+    row = db.execute(_user_analytics_statement(user_id)).first()
+    if not row:
+        return None
+    
+    return _build_user_analytics(row, _row_counts(row))
+
+def get_overview_analytics(db: Session):
+    """Get overview analytics in a single query"""
+    return _build_overview_analytics(db.execute(_overview_statement()).one())
+
+# Read timeline
+# Reads are bucketed by read_at in SQL (strftime on SQLite, date_trunc on
+# PostgreSQL); only non-empty buckets are returned.
+TIMELINE_SQLITE_FORMATS = {
+    "minute": "%Y-%m-%d %H:%M:00",
+    "hour": "%Y-%m-%d %H:00:00",
+    "day": "%Y-%m-%d 00:00:00",
+}
+
+# Upper bounds (seconds) of the time-to-open buckets; anything slower is "7d+"
+TIME_TO_OPEN_BUCKETS = [
+    ("0-5m", 5 * 60),
+    ("5m-1h", 3600),
+    ("1h-6h", 6 * 3600),
+    ("6h-24h", 24 * 3600),
+    ("1d-7d", 7 * 24 * 3600),
+]
+TIME_TO_OPEN_OVERFLOW = "7d+"
+
+def _time_bucket(dialect_name: str, granularity: str, column):
+    if dialect_name == "postgresql":
+        return func.date_trunc(granularity, column)
+    if dialect_name == "sqlite":
+        return func.strftime(TIMELINE_SQLITE_FORMATS[granularity], column)
+    raise NotImplementedError(f"Timelines are not supported on {dialect_name}")
+
+def _seconds_between(dialect_name: str, start, end):
+    if dialect_name == "postgresql":
+        return func.extract("epoch", end - start)
+    if dialect_name == "sqlite":
+        return (func.julianday(end) - func.julianday(start)) * 86400
+    raise NotImplementedError(f"Timelines are not supported on {dialect_name}")
+
+def _read_timeline_statements(dialect_name: str, meeting_id: Optional[int], granularity: str,
+                              start: Optional[datetime], end: Optional[datetime]):
+    """Reads per bucket and the time-to-open distribution, both grouped in SQL"""
+    Recipient = models.Recipient
+    filters = [Recipient.read_at.isnot(None)]
+    if meeting_id is not None:
+        filters.append(Recipient.meetingId == meeting_id)
+    if start is not None:
+        filters.append(Recipient.read_at >= start)
+    if end is not None:
+        filters.append(Recipient.read_at < end)
+    
+    # Bucket expressions are grouped through a subquery column so bound
+    # parameters are not repeated in GROUP BY (server-side binding rejects that)
+    buckets = select(
+        _time_bucket(dialect_name, granularity, Recipient.read_at).label("bucket_start")
+    ).where(*filters).subquery()
+    timeline = select(
+        buckets.c.bucket_start, func.count().label("reads")
+    ).group_by(buckets.c.bucket_start).order_by(buckets.c.bucket_start)
+    
+    seconds = _seconds_between(dialect_name, Recipient.created_at, Recipient.read_at)
+    delays = select(
+        case(
+            *[(seconds < limit, label) for label, limit in TIME_TO_OPEN_BUCKETS],
+            else_=TIME_TO_OPEN_OVERFLOW
+        ).label("bucket")
+    ).where(*filters).subquery()
+    distribution = select(delays.c.bucket, func.count().label("count")).group_by(delays.c.bucket)
+    return timeline, distribution
+
+def _bucket_datetime(value) -> datetime:
+    # SQLite returns the strftime text, PostgreSQL a timestamp
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+def _build_read_timeline(meeting_id: Optional[int], granularity: str, start: Optional[datetime],
+                         end: Optional[datetime], timeline_rows, distribution_rows):
+    counts = {row.bucket: row.count for row in distribution_rows}
+    labels = [label for label, _ in TIME_TO_OPEN_BUCKETS] + [TIME_TO_OPEN_OVERFLOW]
+    buckets = [
+        schemas.TimelineBucket(bucket_start=_bucket_datetime(row.bucket_start), reads=row.reads)
+        for row in timeline_rows
+    ]
+    
+    return schemas.ReadTimeline(
+        meetingId=meeting_id,
+        granularity=granularity,
+        start=start,
+        end=end,
+        total_reads=sum(bucket.reads for bucket in buckets),
+        buckets=buckets,
+        time_to_open=[schemas.TimeToOpenBucket(bucket=label, count=counts.get(label, 0)) for label in labels]
+    )
+
+def get_read_timeline(db: Session, meeting_id: Optional[int] = None, granularity: str = "hour",
+                      start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """Get reads per time bucket and time-to-open for a meeting, or for all meetings"""
+    timeline, distribution = _read_timeline_statements(
+        db.get_bind().dialect.name, meeting_id, granularity, start, end
+    )
+    return _build_read_timeline(
+        meeting_id, granularity, start, end,
+        db.execute(timeline).all(), db.execute(distribution).all()
+    )
@@ -1,24 +1,206 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import create_engine, event, Column, Integer, String, DateTime, ForeignKey, Text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from sqlalchemy.sql import func
 import os
 from dotenv import load_dotenv
+from .metrics import instrument_engine, METRICS_ENABLED
 
 load_dotenv()
 
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./database/email_tracking.db")
 
+# Async drivers and the sync driver used alongside them for DDL and scripts
+ASYNC_DRIVERS = {
+    "sqlite+aiosqlite": "sqlite",
+    "postgresql+asyncpg": "postgresql",
+}
+
+def _split_async_url(url: str):
+    """Return (sync_url, async_url); async_url is None for sync drivers"""
+    scheme, sep, rest = url.partition("://")
+    if scheme in ASYNC_DRIVERS:
+        return ASYNC_DRIVERS[scheme] + sep + rest, url
+    return url, None
+
+SYNC_DATABASE_URL, ASYNC_DATABASE_URL = _split_async_url(DATABASE_URL)
+USE_ASYNC_DB = ASYNC_DATABASE_URL is not None
+
+# Engine profiles. DB_PROFILE picks a preset for the database in use; any
+# single setting can still be overridden through its own variable below.
+DB_PROFILE = os.getenv("DB_PROFILE", "balanced")
+
+SQLITE_PROFILES = {
+    # Driver defaults: rollback journal, FULL sync
+    "default": {},
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -16000,
+    },
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 10000,
+        "cache_size": -64000,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+    },
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 10000,
+    },
+}
+
+POSTGRES_PROFILES = {
+    "default": {},
+    "balanced": {
+        "pool_size": 10,
+        "max_overflow": 20,
+        "pool_pre_ping": True,
+        "pool_recycle": 1800,
+        "statement_timeout": 30000,
+    },
+    "performance": {
+        "pool_size": 20,
+        "max_overflow": 40,
+        "pool_pre_ping": True,
+        "pool_recycle": 1800,
+        "statement_timeout": 15000,
+    },
+    "durable": {
+        "pool_size": 10,
+        "max_overflow": 10,
+        "pool_pre_ping": True,
+        "pool_recycle": 900,
+        "statement_timeout": 60000,
+    },
+}
+
+def _env_overrides(names: dict) -> dict:
+    """Read per-setting overrides, converting them like the profile values"""
+    overrides = {}
+    for setting, (env_name, convert) in names.items():
+        value = os.getenv(env_name)
+        if value is not None and value != "":
+            overrides[setting] = convert(value)
+    return overrides
+
+def _env_bool(value: str) -> bool:
+    return value.lower() in ("1", "true", "yes")
+
+SQLITE_OVERRIDES = {
+    "journal_mode": ("SQLITE_JOURNAL_MODE", str.upper),
+    "synchronous": ("SQLITE_SYNCHRONOUS", str.upper),
+    "busy_timeout": ("SQLITE_BUSY_TIMEOUT", int),
+    "cache_size": ("SQLITE_CACHE_SIZE", int),
+    "mmap_size": ("SQLITE_MMAP_SIZE", int),
+    "temp_store": ("SQLITE_TEMP_STORE", str.upper),
+}
+
+POSTGRES_OVERRIDES = {
+    "pool_size": ("DB_POOL_SIZE", int),
+    "max_overflow": ("DB_MAX_OVERFLOW", int),
+    "pool_pre_ping": ("DB_POOL_PRE_PING", _env_bool),
+    "pool_recycle": ("DB_POOL_RECYCLE", int),
+    "statement_timeout": ("DB_STATEMENT_TIMEOUT", int),
+}
+
+def _profile_settings(profiles: dict, overrides: dict) -> dict:
+    if DB_PROFILE not in profiles:
+        raise ValueError(f"Unknown DB_PROFILE {DB_PROFILE!r}; expected one of {', '.join(profiles)}")
+    return {**profiles[DB_PROFILE], **_env_overrides(overrides)}
+
+def _backend_name(url: str) -> str:
+    return url.partition("://")[0].partition("+")[0]
+
+DB_BACKEND = _backend_name(SYNC_DATABASE_URL)
+if DB_BACKEND == "sqlite":
+    DB_SETTINGS = _profile_settings(SQLITE_PROFILES, SQLITE_OVERRIDES)
+elif DB_BACKEND == "postgresql":
+    DB_SETTINGS = _profile_settings(POSTGRES_PROFILES, POSTGRES_OVERRIDES)
+else:
+    DB_SETTINGS = {}
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply the profile's pragmas to every new SQLite connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma, value in DB_SETTINGS.items():
+            cursor.execute(f"PRAGMA {pragma}={value}")
+    finally:
+        cursor.close()
+
+def _engine_options(async_driver: bool = False) -> dict:
+    """create_engine keyword arguments for the configured profile"""
+    if DB_BACKEND == "sqlite":
+        return {"connect_args": {"check_same_thread": False}}
+    if DB_BACKEND != "postgresql":
+        return {}
+    
+    options = {
+        key: DB_SETTINGS[key]
+        for key in ("pool_size", "max_overflow", "pool_pre_ping", "pool_recycle")
+        if key in DB_SETTINGS
+    }
+    statement_timeout = DB_SETTINGS.get("statement_timeout")
+    if statement_timeout:
+        if async_driver:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(statement_timeout)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={statement_timeout}"}
+    return options
+
 # Create engine
-engine = create_engine(
-    DATABASE_URL, 
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+engine = create_engine(SYNC_DATABASE_URL, **_engine_options())
+if DB_BACKEND == "sqlite":
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
+if METRICS_ENABLED:
+    instrument_engine(engine)
 
 # Create session
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine and session, only when DATABASE_URL names an async driver
+async_engine = None
+AsyncSessionLocal = None
+if USE_ASYNC_DB:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_options(async_driver=True))
+    if DB_BACKEND == "sqlite":
+        event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    if METRICS_ENABLED:
+        instrument_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+
+def effective_settings(bind=None) -> dict:
+    """
+    Settings as the database reports them on a live connection, plus pool
+    configuration; used for the startup log line
+    """
+    bind = bind or engine
+    settings = {"profile": DB_PROFILE, "backend": DB_BACKEND}
+    with bind.connect() as conn:
+        if DB_BACKEND == "sqlite":
+            for pragma in ("journal_mode", "synchronous", "busy_timeout", "cache_size", "mmap_size", "temp_store"):
+                settings[pragma] = conn.exec_driver_sql(f"PRAGMA {pragma}").scalar()
+        elif DB_BACKEND == "postgresql":
+            settings["statement_timeout"] = conn.exec_driver_sql("SHOW statement_timeout").scalar()
+    if DB_BACKEND == "postgresql":
+        settings["pool_size"] = bind.pool.size()
+        settings.update({
+            key: DB_SETTINGS[key]
+            for key in ("max_overflow", "pool_pre_ping", "pool_recycle")
+            if key in DB_SETTINGS
+        })
+    return settings
+
 # Base class for models
 Base = declarative_base()
 
@@ -30,6 +212,15 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """Dependency to get an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Dependency for async routes: an AsyncSession when DATABASE_URL names an
+# async driver, otherwise a regular Session (used through async_crud.run)
+get_db_session = get_async_db if USE_ASYNC_DB else get_db
+
 def create_tables():
     """Create all database tables"""
     Base.metadata.create_all(bind=engine)
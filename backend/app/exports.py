@@ -0,0 +1,59 @@
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from typing import Iterator
+from dotenv import load_dotenv
+from . import crud
+from .database import SessionLocal
+
+load_dotenv()
+
+# Rows fetched from the server-side cursor per round trip
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _ndjson_chunk(columns, rows) -> str:
+    return "".join(
+        json.dumps(dict(zip(columns, row)), default=_json_default) + "\n" for row in rows
+    )
+
+def _csv_chunk(rows, header=None) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+    writer.writerows(
+        [value.isoformat() if isinstance(value, datetime) else value for value in row]
+        for row in rows
+    )
+    return buffer.getvalue()
+
+def stream_recipient_export(meeting_id: int, fmt: str = "ndjson",
+                            batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[str]:
+    """
+    Yield a meeting's recipient status as NDJSON or CSV, one chunk per batch
+    of rows. Uses its own session because the response body is produced after
+    the request's dependencies have been cleaned up.
+    """
+    db = SessionLocal()
+    try:
+        result = crud.stream_meeting_recipients(db, meeting_id, batch_size)
+        columns = list(result.keys())
+        header = columns if fmt == "csv" else None
+        if header:
+            yield _csv_chunk([], header)
+        for rows in result.partitions():
+            yield _ndjson_chunk(columns, rows) if fmt == "ndjson" else _csv_chunk(rows)
+    finally:
+        db.close()
@@ -1,13 +1,32 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from .routers import tracking, meetings, users, senders_recipients, analytics
-from .database import create_tables
+from .database import SessionLocal, async_engine, effective_settings
+from .migrations import prepare_database
+from .read_buffer import read_buffer, WRITE_BEHIND_ENABLED
+from .open_events import open_event_rollup, OPEN_EVENTS_ENABLED, ROLLUP_IN_APP
+from .read_cache import read_cache
+from .pagination import NEXT_CURSOR_HEADER
+from .tokens import tracking_secret
+from . import metrics
+import logging
 import os
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
+logger = logging.getLogger(__name__)
+
+# Refuse to start without a signing secret rather than accept forged tokens
+tracking_secret()
+
+# Production runs migrate once before starting workers (see run.py) and
+# turn this off so workers do not race each other applying migrations
+RUN_MIGRATIONS_ON_STARTUP = os.getenv("RUN_MIGRATIONS_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+
 # Create FastAPI application
 app = FastAPI(
     title="Email Read Tracking API",
@@ -26,8 +45,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
 # Include routers
 app.include_router(tracking.router)
 app.include_router(meetings.router)
@@ -37,8 +60,29 @@ app.include_router(analytics.router)
 
 @app.on_event("startup")
 async def startup_event():
-    """Create database tables on startup"""
-    create_tables()
+    """Apply pending migrations (unless run separately) and start background tasks"""
+    logger.info("Database settings: %s", effective_settings())
+    if RUN_MIGRATIONS_ON_STARTUP:
+        prepare_database()
+    db = SessionLocal()
+    try:
+        read_cache.warm(db)
+    finally:
+        db.close()
+    # Repeat opens are always queued (see tracking._record_read)
+    if WRITE_BEHIND_ENABLED or OPEN_EVENTS_ENABLED:
+        await read_buffer.start()
+    if OPEN_EVENTS_ENABLED and ROLLUP_IN_APP:
+        await open_event_rollup.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush queued tracking events before exit"""
+    await open_event_rollup.stop()
+    await read_buffer.stop()
+    if async_engine is not None:
+        await async_engine.dispose()
+    metrics.mark_process_dead(os.getpid())
 
 @app.get("/")
 async def root():
@@ -55,3 +99,8 @@ async def root():
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "email-read-tracking"}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus metrics for this process, or for all workers in multiprocess mode"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,155 @@
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from sqlalchemy import event
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Prometheus metrics recorded with prometheus_client and rendered at /metrics.
+# A single process exposes the default registry. Workers sharing one port
+# (run.py --prod) get PROMETHEUS_MULTIPROC_DIR, which prometheus_client reads
+# at import to record into shared files; a scrape of any worker then reports
+# the totals across all of them.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+BATCH_SIZE_BUCKETS = (1, 10, 50, 100, 250, 500, 1000, 5000)
+
+def render() -> bytes:
+    """All metrics in the Prometheus text format, across workers in multiprocess mode"""
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+def mark_process_dead(pid: int):
+    """Drop an exited worker's live gauges from the multiprocess totals"""
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
+
+# HTTP
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route and status", ["method", "route", "status"]
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ["method", "route"],
+    buckets=LATENCY_BUCKETS
+)
+# The route is only known once routing has run, so in-flight is per method
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", ["method"],
+    multiprocess_mode="livesum"
+)
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements executed per HTTP request", ["method", "route"],
+    buckets=QUERY_COUNT_BUCKETS
+)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Cumulative SQL time per HTTP request", ["method", "route"],
+    buckets=LATENCY_BUCKETS
+)
+
+# Database
+DB_QUERIES = Counter("db_queries_total", "SQL statements executed")
+DB_QUERY_SECONDS = Histogram("db_query_duration_seconds", "SQL statement latency", buckets=LATENCY_BUCKETS)
+
+# Background work
+TRACKING_QUEUE_DEPTH = Gauge(
+    "tracking_queue_depth", "Read events waiting in the write-behind queue", multiprocess_mode="livesum"
+)
+TRACKING_EVENTS_DROPPED = Counter("tracking_events_dropped_total", "Read events dropped because the queue was full")
+TRACKING_FLUSH_SECONDS = Histogram(
+    "tracking_flush_duration_seconds", "Write-behind batch flush latency", buckets=LATENCY_BUCKETS
+)
+TRACKING_FLUSH_EVENTS = Histogram(
+    "tracking_flush_events", "Read events written per flush", buckets=BATCH_SIZE_BUCKETS
+)
+ROLLUP_SECONDS = Histogram(
+    "open_event_rollup_duration_seconds", "Open event rollup latency", buckets=LATENCY_BUCKETS
+)
+
+class RequestDBStats:
+    """SQL statements and time attributed to the current request"""
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+# Set by the middleware; copied into threadpool workers along with the context
+_request_db_stats: ContextVar[Optional[RequestDBStats]] = ContextVar("request_db_stats", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    DB_QUERIES.inc()
+    DB_QUERY_SECONDS.observe(elapsed)
+    stats = _request_db_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+
+def _handle_error(exception_context):
+    start_times = exception_context.connection.info.get("query_start_time") if exception_context.connection else None
+    if start_times:
+        start_times.pop()
+
+def instrument_engine(engine):
+    """Count and time every statement run through a (sync) engine"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+def _route_template(scope) -> str:
+    # Label by path template, not raw path, to keep label cardinality bounded;
+    # FastAPI stores the matched route in the scope
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Plain Starlette routes (docs, openapi.json) have fixed paths
+    return scope["path"] if "endpoint" in scope else "unmatched"
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, in-flight requests and per-request SQL usage"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stats = RequestDBStats()
+        token = _request_db_stats.set(stats)
+        in_flight = HTTP_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_flight.dec()
+            _request_db_stats.reset(token)
+            route = _route_template(scope)
+            HTTP_REQUESTS.labels(method, route, status).inc()
+            HTTP_REQUEST_SECONDS.labels(method, route).observe(elapsed)
+            HTTP_REQUEST_DB_QUERIES.labels(method, route).observe(stats.queries)
+            HTTP_REQUEST_DB_SECONDS.labels(method, route).observe(stats.seconds)
@@ -0,0 +1,107 @@
+import logging
+from typing import List
+from sqlalchemy import select, insert, delete, exists, case, and_, or_
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from . import models, crud
+from .database import Base, engine
+
+logger = logging.getLogger(__name__)
+
+# Versioned schema migrations. create_all() only creates missing tables, so
+# anything added to an existing table (indexes, constraints, backfills) is
+# applied here, in order, exactly once per database.
+
+# Rank used to keep the most advanced recipient row when deduplicating
+STATUS_RANK = {"EMAIL_CREATED": 0, "EMAIL_SENT": 1, "EMAIL_READ": 2}
+
+def _dedupe_pairs(conn: Connection, table, rank=None) -> int:
+    """
+    Delete duplicate (meetingId, userId) rows, keeping the highest-ranked
+    row of each pair and the oldest among equals
+    """
+    other = table.alias("other")
+    better = other.c.id < table.c.id
+    if rank is not None:
+        better = or_(rank(other) > rank(table), and_(rank(other) == rank(table), better))
+    duplicate = exists().where(
+        other.c.meetingId == table.c.meetingId,
+        other.c.userId == table.c.userId,
+        better
+    )
+    return conn.execute(delete(table).where(duplicate)).rowcount
+
+def _status_rank(table):
+    return case(
+        *[(table.c.status == status, rank) for status, rank in STATUS_RANK.items()],
+        else_=-1
+    )
+
+def _create_indexes(conn: Connection, table, names):
+    for index in table.indexes:
+        if index.name in names:
+            index.create(conn, checkfirst=True)
+
+def migration_0001_lookup_indexes(conn: Connection):
+    """Unique (meetingId, userId) on recipient and sender, plus recipient lookup indexes"""
+    recipient = models.Recipient.__table__
+    sender = models.Sender.__table__
+    
+    removed = _dedupe_pairs(conn, recipient, rank=_status_rank)
+    _dedupe_pairs(conn, sender)
+    if removed:
+        crud._recount_counters(conn)
+    
+    _create_indexes(conn, recipient, {
+        "ux_recipient_meeting_user", "ix_recipient_user", "ix_recipient_status", "ix_recipient_read_at"
+    })
+    _create_indexes(conn, sender, {"ux_sender_meeting_user"})
+
+def migration_0002_meeting_read_at_index(conn: Connection):
+    """(meetingId, read_at) on recipient for per-meeting read timelines"""
+    _create_indexes(conn, models.Recipient.__table__, {"ix_recipient_meeting_read_at"})
+
+def migration_0003_seed_rollup_state(conn: Connection):
+    """
+    RollupState row of the open event rollup, so rollups only ever lock an
+    existing row instead of racing to create it
+    """
+    state = models.RollupState.__table__
+    seeded = conn.execute(select(state.c.name).where(state.c.name == crud.OPEN_EVENT_ROLLUP)).first()
+    if seeded is None:
+        conn.execute(insert(state).values(name=crud.OPEN_EVENT_ROLLUP, last_event_id=0))
+
+MIGRATIONS = [
+    (1, "lookup_indexes", migration_0001_lookup_indexes),
+    (2, "meeting_read_at_index", migration_0002_meeting_read_at_index),
+    (3, "seed_rollup_state", migration_0003_seed_rollup_state),
+]
+
+def run_migrations(bind=engine) -> List[int]:
+    """Create missing tables, then apply pending migrations in version order"""
+    Base.metadata.create_all(bind=bind)
+    with bind.connect() as conn:
+        applied_versions = set(conn.execute(select(models.SchemaMigration.version)).scalars())
+    
+    applied = []
+    for version, name, migrate in MIGRATIONS:
+        if version in applied_versions:
+            continue
+        with bind.begin() as conn:
+            migrate(conn)
+            conn.execute(insert(models.SchemaMigration.__table__).values(version=version, name=name))
+        logger.info("Applied migration %04d_%s", version, name)
+        applied.append(version)
+    return applied
+
+def prepare_database(bind=engine) -> List[int]:
+    """
+    One-shot schema setup: apply migrations, then backfill the counter
+    tables if recipients exist without them
+    """
+    applied = run_migrations(bind)
+    with Session(bind) as db:
+        if crud.counters_need_rebuild(db):
+            crud.rebuild_counters(db)
+            logger.info("Rebuilt meeting and user counters")
+    return applied
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
@@ -43,6 +43,10 @@ class Sender(Base):
     # Relationships
     meeting = relationship("Meeting", back_populates="senders")
     user = relationship("User", back_populates="sent_meetings")
+    
+    __table_args__ = (
+        Index("ux_sender_meeting_user", "meetingId", "userId", unique=True),
+    )
 
 class Recipient(Base):
     """Recipient model for tracking email recipients and read status"""
@@ -61,3 +65,85 @@ class Recipient(Base):
     # Relationships
     meeting = relationship("Meeting", back_populates="recipients")
     user = relationship("User", back_populates="received_meetings")
+    
+    __table_args__ = (
+        Index("ux_recipient_meeting_user", "meetingId", "userId", unique=True),
+        Index("ix_recipient_user", "userId"),
+        Index("ix_recipient_status", "status"),
+        Index("ix_recipient_read_at", "read_at"),
+        Index("ix_recipient_meeting_read_at", "meetingId", "read_at"),
+    )
+
+class EmailOpenEvent(Base):
+    """
+    Append-only log of every tracking pixel hit.
+    Deliberately has no foreign keys so inserts never touch the recipient,
+    meeting or user rows; open_date is the daily partition key.
+    """
+    __tablename__ = "email_open_event"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    meetingId = Column(Integer, nullable=False)
+    userId = Column(Integer, nullable=False)
+    opened_at = Column(DateTime(timezone=True), nullable=False)
+    open_date = Column(Date, nullable=False)
+    user_agent = Column(Text, nullable=True)
+    ip_address = Column(String(45), nullable=True)
+    
+    __table_args__ = (
+        Index("ix_email_open_event_date_meeting", "open_date", "meetingId"),
+        Index("ix_email_open_event_meeting_user", "meetingId", "userId"),
+    )
+
+class EmailOpenDaily(Base):
+    """Per-meeting, per-day rollup of open events"""
+    __tablename__ = "email_open_daily"
+    
+    meetingId = Column(Integer, primary_key=True)
+    open_date = Column(Date, primary_key=True)
+    opens = Column(Integer, nullable=False, default=0)
+    unique_openers = Column(Integer, nullable=False, default=0)
+
+class EmailOpenSummary(Base):
+    """Per-meeting rollup of open events across all days"""
+    __tablename__ = "email_open_summary"
+    
+    meetingId = Column(Integer, primary_key=True)
+    total_opens = Column(Integer, nullable=False, default=0)
+    unique_openers = Column(Integer, nullable=False, default=0)
+    first_open_at = Column(DateTime(timezone=True), nullable=True)
+    last_open_at = Column(DateTime(timezone=True), nullable=True)
+
+class RollupState(Base):
+    """High-water mark of the last event folded into the rollups"""
+    __tablename__ = "rollup_state"
+    
+    name = Column(String(50), primary_key=True)
+    last_event_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class MeetingCounter(Base):
+    """Recipient status counts per meeting, maintained with each status change"""
+    __tablename__ = "meeting_counter"
+    
+    meetingId = Column(Integer, primary_key=True)
+    created_count = Column(Integer, nullable=False, default=0)
+    sent_count = Column(Integer, nullable=False, default=0)
+    read_count = Column(Integer, nullable=False, default=0)
+
+class UserCounter(Base):
+    """Recipient status counts per user, maintained with each status change"""
+    __tablename__ = "user_counter"
+    
+    userId = Column(Integer, primary_key=True)
+    created_count = Column(Integer, nullable=False, default=0)
+    sent_count = Column(Integer, nullable=False, default=0)
+    read_count = Column(Integer, nullable=False, default=0)
+
+class SchemaMigration(Base):
+    """Versions applied by the migration runner"""
+    __tablename__ = "schema_migration"
+    
+    version = Column(Integer, primary_key=True)
+    name = Column(String(255), nullable=False)
+    applied_at = Column(DateTime(timezone=True), server_default=func.now())
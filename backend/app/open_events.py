@@ -0,0 +1,63 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+from starlette.concurrency import run_in_threadpool
+from dotenv import load_dotenv
+from . import crud, metrics
+from .database import SessionLocal
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Open event log configuration
+OPEN_EVENTS_ENABLED = os.getenv("OPEN_EVENTS_ENABLED", "true").lower() in ("1", "true", "yes")
+ROLLUP_INTERVAL = float(os.getenv("OPEN_EVENTS_ROLLUP_INTERVAL", "60"))
+# run.py --prod turns this off in the workers and runs the rollup in one
+# dedicated process, so workers never race on the high-water mark
+ROLLUP_IN_APP = os.getenv("OPEN_EVENTS_ROLLUP_IN_APP", "true").lower() in ("1", "true", "yes")
+
+def run_rollup() -> int:
+    """Fold new open events into the rollup tables once"""
+    db = SessionLocal()
+    start = time.perf_counter()
+    try:
+        return crud.rollup_open_events(db)
+    finally:
+        db.close()
+        metrics.ROLLUP_SECONDS.observe(time.perf_counter() - start)
+
+class OpenEventRollup:
+    """Background task that periodically folds open events into rollups"""
+
+    def __init__(self, interval: float = ROLLUP_INTERVAL):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start the periodic rollup task"""
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the periodic rollup task"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await run_in_threadpool(run_rollup)
+            except Exception:
+                logger.exception("Open event rollup failed")
+
+# Shared rollup task started by the application
+open_event_rollup = OpenEventRollup()
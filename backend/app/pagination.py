@@ -0,0 +1,54 @@
+import base64
+import binascii
+import json
+from typing import Optional
+from fastapi import HTTPException, Query, Response
+
+# Keyset pagination: a cursor encodes the sort key of the last row on a page,
+# so the next page is an indexed range scan (key > cursor) at any depth.
+
+# Response header carrying the cursor for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_PAGE_SIZE = 1000
+
+class InvalidCursor(ValueError):
+    """Cursor is malformed or was not issued by this API"""
+
+def encode_cursor(key: int) -> str:
+    """Encode the last row's sort key as an opaque URL-safe cursor"""
+    raw = json.dumps({"k": key}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+def decode_cursor(cursor: str) -> int:
+    """Return the sort key stored in a cursor; raises InvalidCursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw)["k"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise InvalidCursor("Malformed cursor")
+    if not isinstance(key, int) or isinstance(key, bool):
+        raise InvalidCursor("Malformed cursor")
+    return key
+
+def cursor_param(cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header")) -> Optional[int]:
+    """Dependency decoding the ?cursor= query parameter into a sort key"""
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def optional_page_limit(limit: Optional[int], after: Optional[int]) -> Optional[int]:
+    """
+    Page size for endpoints that predate pagination: None (every row, no
+    cursor) when the client asked for neither a limit nor a cursor.
+    """
+    if limit is None and after is None:
+        return None
+    return limit or MAX_PAGE_SIZE
+
+def set_next_cursor(response: Response, page: list, limit: Optional[int], key: str):
+    """Advertise the next page when this one came back full"""
+    if limit is not None and len(page) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(getattr(page[-1], key))
@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import List, Optional
+from starlette.concurrency import run_in_threadpool
+from dotenv import load_dotenv
+from . import crud, async_crud
+from .database import SessionLocal, AsyncSessionLocal, USE_ASYNC_DB
+from .open_events import OPEN_EVENTS_ENABLED
+from . import metrics
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Write-behind configuration
+WRITE_BEHIND_ENABLED = os.getenv("TRACKING_WRITE_BEHIND", "false").lower() in ("1", "true", "yes")
+FLUSH_INTERVAL = float(os.getenv("TRACKING_FLUSH_INTERVAL", "1.0"))
+BATCH_SIZE = int(os.getenv("TRACKING_BATCH_SIZE", "500"))
+QUEUE_SIZE = int(os.getenv("TRACKING_QUEUE_SIZE", "10000"))
+
+@dataclass
+class ReadEvent:
+    """A single tracking pixel hit waiting to be written"""
+    meeting_id: int
+    user_id: int
+    read_at: datetime
+    user_agent: Optional[str] = None
+    ip_address: Optional[str] = None
+    already_read: bool = False
+
+class ReadEventBuffer:
+    """
+    In-process queue of read events flushed to the database in batches.
+    Events are dropped (and counted) when the queue is full so the tracking
+    endpoint never waits on the database.
+    """
+
+    def __init__(self, flush_interval: float = FLUSH_INTERVAL, batch_size: int = BATCH_SIZE,
+                 max_queue_size: int = QUEUE_SIZE):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        self.enqueued = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    def enqueue(self, event: ReadEvent) -> bool:
+        """Queue an event without blocking; returns False if it was dropped"""
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            metrics.TRACKING_EVENTS_DROPPED.inc()
+            return False
+        self.enqueued += 1
+        metrics.TRACKING_QUEUE_DEPTH.set(self._queue.qsize())
+        return True
+
+    async def start(self):
+        """Start the background flush task"""
+        if self._task is None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Stop the flush task and write out everything still queued. The task
+        is signalled rather than cancelled, so a batch being collected or
+        written is flushed instead of lost.
+        """
+        self._stopping.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+        while not self._queue.empty():
+            batch = self._drain(self.batch_size)
+            await self._flush(batch)
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            batch = await self._collect()
+            if batch:
+                await self._flush(batch)
+
+    async def _collect(self) -> List[ReadEvent]:
+        """Wait for up to one flush interval, a full batch or stop()"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        batch: List[ReadEvent] = []
+        stopping = asyncio.ensure_future(self._stopping.wait())
+        try:
+            while len(batch) < self.batch_size and not stopping.done():
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                getter = asyncio.ensure_future(self._queue.get())
+                await asyncio.wait({getter, stopping}, timeout=timeout,
+                                   return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    try:
+                        # The get may have completed while being cancelled
+                        batch.append(await getter)
+                    except asyncio.CancelledError:
+                        break
+                else:
+                    batch.append(getter.result())
+                batch.extend(self._drain(self.batch_size - len(batch)))
+        finally:
+            stopping.cancel()
+        return batch
+
+    def _drain(self, limit: int) -> List[ReadEvent]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _flush(self, batch: List[ReadEvent]):
+        metrics.TRACKING_QUEUE_DEPTH.set(self._queue.qsize())
+        start = time.perf_counter()
+        try:
+            if USE_ASYNC_DB:
+                await _write_batch_async(batch)
+            else:
+                await run_in_threadpool(_write_batch, batch)
+        except Exception:
+            self.failed += len(batch)
+            logger.exception("Failed to flush %d read events", len(batch))
+        else:
+            self.flushed += len(batch)
+            self.batches += 1
+        finally:
+            metrics.TRACKING_FLUSH_SECONDS.observe(time.perf_counter() - start)
+            metrics.TRACKING_FLUSH_EVENTS.observe(len(batch))
+
+    def stats(self) -> dict:
+        """Current buffer counters"""
+        return {
+            "enabled": WRITE_BEHIND_ENABLED,
+            "queue_depth": self._queue.qsize(),
+            "enqueued": self.enqueued,
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+            "flush_interval": self.flush_interval,
+            "batch_size": self.batch_size,
+        }
+
+def _batch_events(batch: List[ReadEvent]) -> List[dict]:
+    return [
+        {
+            "meeting_id": event.meeting_id,
+            "user_id": event.user_id,
+            "read_at": event.read_at,
+            "user_agent": event.user_agent,
+            "ip_address": event.ip_address,
+            "already_read": event.already_read,
+        }
+        for event in batch
+    ]
+
+def _write_batch(batch: List[ReadEvent]):
+    write = crud.record_email_opens if OPEN_EVENTS_ENABLED else crud.mark_recipients_read
+    db = SessionLocal()
+    try:
+        write(db, _batch_events(batch))
+    finally:
+        db.close()
+
+async def _write_batch_async(batch: List[ReadEvent]):
+    write = async_crud.record_email_opens if OPEN_EVENTS_ENABLED else async_crud.mark_recipients_read
+    async with AsyncSessionLocal() as db:
+        await write(db, _batch_events(batch))
+
+def make_read_event(meeting_id: int, user_id: int, user_agent: Optional[str] = None,
+                    ip_address: Optional[str] = None, already_read: bool = False) -> ReadEvent:
+    """Build a read event stamped with the current time"""
+    return ReadEvent(
+        meeting_id=meeting_id,
+        user_id=user_id,
+        read_at=datetime.now(timezone.utc),
+        user_agent=user_agent,
+        ip_address=ip_address,
+        already_read=already_read,
+    )
+
+# Shared buffer used by the tracking router
+read_buffer = ReadEventBuffer()
@@ -0,0 +1,92 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Tuple
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from . import models
+
+load_dotenv()
+
+# Already-read cache configuration
+READ_CACHE_ENABLED = os.getenv("READ_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+READ_CACHE_SIZE = int(os.getenv("READ_CACHE_SIZE", "100000"))
+
+class ReadCache:
+    """
+    Bounded LRU set of (meetingId, userId) pairs known to be EMAIL_READ.
+    Lets repeat pixel hits skip the recipient lookup and update entirely.
+    """
+
+    def __init__(self, capacity: int = READ_CACHE_SIZE, enabled: bool = READ_CACHE_ENABLED):
+        self.capacity = capacity
+        self.enabled = enabled
+        self._pairs: "OrderedDict[Tuple[int, int], None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def contains(self, meeting_id: int, user_id: int) -> bool:
+        """Check whether a recipient is known to be read, counting hits and misses"""
+        if not self.enabled:
+            return False
+        key = (meeting_id, user_id)
+        with self._lock:
+            if key in self._pairs:
+                self._pairs.move_to_end(key)
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def add(self, meeting_id: int, user_id: int):
+        """Remember that a recipient has read the email"""
+        if not self.enabled:
+            return
+        key = (meeting_id, user_id)
+        with self._lock:
+            self._pairs[key] = None
+            self._pairs.move_to_end(key)
+            while len(self._pairs) > self.capacity:
+                self._pairs.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, meeting_id: int, user_id: int):
+        """Forget a recipient whose status moved away from EMAIL_READ"""
+        with self._lock:
+            self._pairs.pop((meeting_id, user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._pairs.clear()
+
+    def warm(self, db: Session) -> int:
+        """Load the most recently read recipients from the database"""
+        if not self.enabled:
+            return 0
+        rows = db.query(models.Recipient.meetingId, models.Recipient.userId).filter(
+            models.Recipient.status == "EMAIL_READ"
+        ).order_by(models.Recipient.read_at.desc()).limit(self.capacity).all()
+        # Insert oldest first so the newest reads end up most recently used
+        for meeting_id, user_id in reversed(rows):
+            self.add(meeting_id, user_id)
+        return len(rows)
+
+    def stats(self) -> dict:
+        """Current cache counters"""
+        with self._lock:
+            size = len(self._pairs)
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": size,
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+# Shared cache used by the tracking router and crud status updates
+read_cache = ReadCache()
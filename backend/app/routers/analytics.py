@@ -1,29 +1,168 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from .. import crud, schemas
-from ..database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
+from datetime import datetime
+from .. import crud, async_crud, schemas
+from ..database import get_db_session
+from ..analytics_cache import analytics_cache, etag_for, meeting_tag, user_tag, OVERVIEW_TAG
+import json
+import os
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
+# "counters" reads the maintained counter tables, "recipients" aggregates recipient rows
+ANALYTICS_SOURCE = os.getenv("ANALYTICS_SOURCE", "counters")
+USE_COUNTERS = ANALYTICS_SOURCE == "counters"
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+async def _cache_call(func, *args):
+    # A network backend (Redis) must not block the event loop
+    if analytics_cache.blocking:
+        return await run_in_threadpool(func, *args)
+    return func(*args)
+
+async def _cached_response(request: Request, key: str, tags: List[str], compute,
+                           not_found: str = None) -> Response:
+    """
+    Serve an analytics response from the cache, computing and storing it on
+    a miss. Every response carries an ETag; a matching If-None-Match gets 304.
+    The generation is read before computing so a result that raced an
+    invalidation is not stored.
+    """
+    await analytics_cache.settle()
+    body, generation = await _cache_call(analytics_cache.lookup, key, tags)
+    if body is None:
+        result = await compute()
+        if result is None and not_found:
+            raise HTTPException(status_code=404, detail=not_found)
+        body = json.dumps(jsonable_encoder(result)).encode()
+        await _cache_call(analytics_cache.set, key, body, tags, generation)
+
+    etag = etag_for(body)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+async def _meeting_or_none(db, meeting_id: int, compute):
+    meeting = await async_crud.run(db, crud.get_meeting, meeting_id)
+    if not meeting:
+        return None
+    return await compute()
+
+@router.get("/cache", response_model=schemas.AnalyticsCacheStats)
+def get_analytics_cache_stats():
+    """Get analytics response cache hit and miss counters"""
+    return analytics_cache.stats()
+
 @router.get("/meeting/{meeting_id}", response_model=schemas.MeetingAnalytics)
-def get_meeting_analytics(meeting_id: int, db: Session = Depends(get_db)):
+async def get_meeting_analytics(meeting_id: int, request: Request, db=Depends(get_db_session)):
     """Get analytics for a specific meeting"""
-    analytics = crud.get_meeting_analytics(db, meeting_id)
-    if not analytics:
-        raise HTTPException(status_code=404, detail="Meeting not found")
-    
-    return analytics
+    return await _cached_response(
+        request,
+        f"meeting:{meeting_id}",
+        [meeting_tag(meeting_id)],
+        lambda: async_crud.run(
+            db,
+            crud.get_meeting_counter_analytics if USE_COUNTERS else crud.get_meeting_analytics,
+            meeting_id
+        ),
+        not_found="Meeting not found"
+    )
 
 @router.get("/user/{user_id}", response_model=schemas.UserAnalytics)
-def get_user_analytics(user_id: int, db: Session = Depends(get_db)):
+async def get_user_analytics(user_id: int, request: Request, db=Depends(get_db_session)):
     """Get analytics for a specific user"""
-    analytics = crud.get_user_analytics(db, user_id)
-    if not analytics:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    return analytics
+    return await _cached_response(
+        request,
+        f"user:{user_id}",
+        [user_tag(user_id)],
+        lambda: async_crud.run(
+            db,
+            crud.get_user_counter_analytics if USE_COUNTERS else crud.get_user_analytics,
+            user_id
+        ),
+        not_found="User not found"
+    )
+
+@router.get("/meetings", response_model=List[schemas.MeetingAnalytics])
+async def get_meetings_analytics(
+    request: Request,
+    meeting_ids: List[int] = Query(...),
+    db=Depends(get_db_session)
+):
+    """Get analytics for many meetings in one query (?meeting_ids=1&meeting_ids=2)"""
+    meeting_ids = sorted(set(meeting_ids))
+    return await _cached_response(
+        request,
+        "meetings:" + ",".join(map(str, meeting_ids)),
+        [meeting_tag(meeting_id) for meeting_id in meeting_ids],
+        lambda: async_crud.run(db, crud.get_meetings_analytics, meeting_ids)
+    )
+
+@router.get("/overview/timeline", response_model=schemas.ReadTimeline)
+async def get_overview_timeline(
+    request: Request,
+    granularity: schemas.TimelineGranularity = schemas.TimelineGranularity.HOUR,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db=Depends(get_db_session)
+):
+    """Get reads per minute, hour or day across all meetings, plus time-to-open"""
+    return await _cached_response(
+        request,
+        f"overview_timeline:{granularity.value}:{start}:{end}",
+        [OVERVIEW_TAG],
+        lambda: async_crud.run(db, crud.get_read_timeline, None, granularity.value, start, end)
+    )
 
 @router.get("/overview", response_model=schemas.OverviewAnalytics)
-def get_overview_analytics(db: Session = Depends(get_db)):
+async def get_overview_analytics(request: Request, db=Depends(get_db_session)):
     """Get overview analytics"""
-    return crud.get_overview_analytics(db)
+    return await _cached_response(
+        request,
+        "overview",
+        [OVERVIEW_TAG],
+        lambda: async_crud.run(db, crud.get_overview_analytics)
+    )
+
+@router.get("/meeting/{meeting_id}/opens", response_model=schemas.MeetingOpenAnalytics)
+async def get_meeting_open_analytics(meeting_id: int, request: Request, db=Depends(get_db_session)):
+    """Get total, unique and repeat opens for a meeting from the rollups"""
+    return await _cached_response(
+        request,
+        f"meeting_opens:{meeting_id}",
+        [meeting_tag(meeting_id)],
+        lambda: _meeting_or_none(
+            db, meeting_id, lambda: async_crud.run(db, crud.get_meeting_open_analytics, meeting_id)
+        ),
+        not_found="Meeting not found"
+    )
+
+@router.get("/meeting/{meeting_id}/timeline", response_model=schemas.ReadTimeline)
+async def get_meeting_timeline(
+    meeting_id: int,
+    request: Request,
+    granularity: schemas.TimelineGranularity = schemas.TimelineGranularity.HOUR,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db=Depends(get_db_session)
+):
+    """Get reads per minute, hour or day for a meeting, plus time-to-open"""
+    return await _cached_response(
+        request,
+        f"meeting_timeline:{meeting_id}:{granularity.value}:{start}:{end}",
+        [meeting_tag(meeting_id)],
+        lambda: _meeting_or_none(
+            db, meeting_id,
+            lambda: async_crud.run(db, crud.get_read_timeline, meeting_id, granularity.value, start, end)
+        ),
+        not_found="Meeting not found"
+    )
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from .. import crud, schemas
 from ..database import get_db
+from ..pagination import cursor_param, optional_page_limit, set_next_cursor, MAX_PAGE_SIZE
+from ..tokens import sign_tracking_token
 
 router = APIRouter(prefix="/meetings", tags=["meetings"])
 
@@ -12,9 +14,17 @@ def create_meeting(meeting: schemas.MeetingCreate, db: Session = Depends(get_db)
     return crud.create_meeting(db=db, meeting=meeting)
 
 @router.get("/", response_model=List[schemas.MeetingResponse])
-def list_meetings(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get list of all meetings"""
-    return crud.get_meetings(db, skip=skip, limit=limit)
+def list_meetings(
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = Depends(cursor_param),
+    db: Session = Depends(get_db)
+):
+    """Get list of all meetings; follow the X-Next-Cursor header for the next page"""
+    meetings = crud.get_meetings(db, skip=skip, limit=limit, after=after)
+    set_next_cursor(response, meetings, limit, "meetingId")
+    return meetings
 
 @router.get("/{meeting_id}", response_model=schemas.MeetingResponse)
 def get_meeting(meeting_id: int, db: Session = Depends(get_db)):
@@ -54,10 +64,55 @@ def get_meeting_senders(meeting_id: int, db: Session = Depends(get_db)):
     return crud.get_meeting_senders(db, meeting_id)
 
 @router.get("/{meeting_id}/recipients", response_model=List[schemas.RecipientResponse])
-def get_meeting_recipients(meeting_id: int, db: Session = Depends(get_db)):
-    """Get all recipients for a specific meeting"""
+def get_meeting_recipients(
+    meeting_id: int,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = Depends(cursor_param),
+    db: Session = Depends(get_db)
+):
+    """
+    Get recipients for a specific meeting. Without limit or cursor every
+    recipient is returned; with either, pages hold at most limit (default
+    1000) rows and the X-Next-Cursor header points to the next page.
+    """
+    meeting = crud.get_meeting(db, meeting_id)
+    if not meeting:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    
+    limit = optional_page_limit(limit, after)
+    recipients = crud.get_meeting_recipients(db, meeting_id, after=after, limit=limit)
+    set_next_cursor(response, recipients, limit, "userId")
+    return recipients
+
+@router.get("/{meeting_id}/mailing-list", response_model=List[schemas.MailingListEntry])
+def get_meeting_mailing_list(
+    meeting_id: int,
+    response: Response,
+    status: Optional[List[schemas.RecipientStatus]] = Query(None, description="Only recipients in these statuses"),
+    ttl: Optional[int] = Query(None, ge=1, description="Tracking token lifetime in seconds"),
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = Depends(cursor_param),
+    db: Session = Depends(get_db)
+):
+    """
+    Name, email and signed tracking token of each recipient, for mail merge.
+    Tokens are signed here so the secret never leaves the API; follow the
+    X-Next-Cursor header for the next page.
+    """
     meeting = crud.get_meeting(db, meeting_id)
     if not meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
     
-    return crud.get_meeting_recipients(db, meeting_id)
+    statuses = [value.value for value in status] if status else None
+    rows = crud.get_meeting_mailing_list(db, meeting_id, statuses, after=after, limit=limit)
+    set_next_cursor(response, rows, limit, "userId")
+    return [
+        schemas.MailingListEntry(
+            userId=row.userId,
+            name=row.name,
+            email=row.email,
+            trackingToken=sign_tracking_token(meeting_id, row.userId, ttl=ttl)
+        )
+        for row in rows
+    ]
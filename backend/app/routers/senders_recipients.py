@@ -6,6 +6,9 @@ from ..database import get_db
 
 router = APIRouter(tags=["senders and recipients"])
 
+# Upper bound on rows accepted by the bulk endpoint
+BULK_MAX_ITEMS = 10000
+
 # Sender endpoints
 @router.post("/senders/", response_model=schemas.SenderResponse)
 def create_sender(sender: schemas.SenderCreate, db: Session = Depends(get_db)):
@@ -46,6 +49,13 @@ def create_recipient(recipient: schemas.RecipientCreate, db: Session = Depends(g
     
     return crud.create_recipient(db=db, recipient=recipient)
 
+@router.post("/recipients/bulk", response_model=List[schemas.RecipientBulkResult])
+def create_recipients_bulk(recipients: List[schemas.RecipientCreate], db: Session = Depends(get_db)):
+    """Add many recipients in one transaction with a per-row outcome"""
+    if len(recipients) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ITEMS} recipients per request")
+    return crud.create_recipients_bulk(db, recipients)
+
 @router.put("/recipients/{meeting_id}/{user_id}", response_model=schemas.RecipientResponse)
 def update_recipient_status(
     meeting_id: int, 
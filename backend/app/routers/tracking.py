@@ -1,70 +1,148 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, Response
-from sqlalchemy.orm import Session
-from typing import List
-from .. import crud, models, schemas
-from ..database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from .. import crud, async_crud, models, schemas
+from ..database import get_db_session
+from ..read_buffer import read_buffer, make_read_event, WRITE_BEHIND_ENABLED
+from ..open_events import OPEN_EVENTS_ENABLED
+from ..read_cache import read_cache
+from ..tokens import verify_tracking_token, InvalidToken, ExpiredToken
+from ..pagination import cursor_param, optional_page_limit, set_next_cursor, MAX_PAGE_SIZE
+from ..exports import stream_recipient_export, EXPORT_FORMATS
 import base64
 
 router = APIRouter(prefix="/track", tags=["tracking"])
 
+# This is a base64 encoded 1x1 transparent PNG
+PIXEL_DATA = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=="
+)
+
+PIXEL_HEADERS = {
+    "Cache-Control": "no-cache, no-store, must-revalidate",
+    "Pragma": "no-cache",
+    "Expires": "0"
+}
+
+def pixel_response() -> Response:
+    """Return the 1x1 transparent tracking pixel"""
+    return Response(content=PIXEL_DATA, media_type="image/png", headers=PIXEL_HEADERS)
+
 @router.get("/email/{meeting_id}/{user_id}")
 async def track_email_read(
     meeting_id: int,
     user_id: int,
     request: Request,
-    db: Session = Depends(get_db)
+    db=Depends(get_db_session)
 ):
     """
     Track email read event and return 1x1 transparent pixel image.
     This endpoint is called when an email is opened via an embedded tracking pixel.
+    With TRACKING_WRITE_BEHIND enabled the event is queued and written in batches.
+    Recipients already known to be read skip the recipient update entirely;
+    their open event, if any, is always queued.
     """
+    return await _record_read(meeting_id, user_id, request, db)
+
+@router.get("/t/{token}")
+async def track_signed_email_read(token: str, request: Request, db=Depends(get_db_session)):
+    """
+    Track email read from a signed token instead of raw IDs.
+    Forged tokens are rejected and expired tokens get the pixel without being
+    recorded, both before any database work.
+    """
+    try:
+        meeting_id, user_id = verify_tracking_token(token)
+    except ExpiredToken:
+        return pixel_response()
+    except InvalidToken:
+        return Response(status_code=404)
     
-    # Check if meeting exists
-    meeting = crud.get_meeting(db, meeting_id)
-    if not meeting:
-        # Still return pixel even if meeting not found to avoid broken images
-        pass
-    print(f"Found meeting {meeting_id} for tracking email")
-    # Check if user exists
-    user = crud.get_user(db, user_id)
-    if not user:
-        # Still return pixel even if user not found to avoid broken images
-        pass
-    print(f"Found user {user_id} for tracking email")
-    # Check if recipient record exists
-    recipient = crud.get_recipient(db, meeting_id, user_id)
-    if recipient and recipient.status != "EMAIL_READ":
-        # Update status to EMAIL_READ
-        crud.update_recipient_status(
-            db=db,
-            meeting_id=meeting_id,
-            user_id=user_id,
-            status="EMAIL_READ",
-            user_agent=request.headers.get("user-agent"),
-            ip_address=request.client.host if request.client else None
-        )
-    
-    # Return 1x1 transparent pixel image
-    # This is a base64 encoded 1x1 transparent PNG
-    pixel_data = base64.b64decode(
-        "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=="
+    return await _record_read(meeting_id, user_id, request, db)
+
+async def _record_read(meeting_id: int, user_id: int, request: Request, db) -> Response:
+    """Record a pixel hit for a recipient and return the pixel"""
+    user_agent = request.headers.get("user-agent")
+    ip_address = request.client.host if request.client else None
+    already_read = read_cache.contains(meeting_id, user_id)
+    if already_read and not OPEN_EVENTS_ENABLED:
+        return pixel_response()
+
+    # Repeat opens only append an event, so they go through the buffer even
+    # without write-behind: no database work on the request path
+    if WRITE_BEHIND_ENABLED or already_read:
+        read_buffer.enqueue(make_read_event(
+            meeting_id,
+            user_id,
+            user_agent=user_agent,
+            ip_address=ip_address,
+            already_read=already_read
+        ))
+        return pixel_response()
+
+    # One conditional UPDATE; unknown or already-read recipients are a no-op
+    record_open = crud.record_email_open if OPEN_EVENTS_ENABLED else crud.mark_recipient_read
+    await async_crud.run(
+        db,
+        record_open,
+        meeting_id=meeting_id,
+        user_id=user_id,
+        user_agent=user_agent,
+        ip_address=ip_address
     )
     
-    return Response(
-        content=pixel_data,
-        media_type="image/png",
-        headers={
-            "Cache-Control": "no-cache, no-store, must-revalidate",
-            "Pragma": "no-cache",
-            "Expires": "0"
-        }
-    )
+    # Return 1x1 transparent pixel image
+    return pixel_response()
+
+@router.get("/buffer", response_model=schemas.ReadBufferStats)
+def get_read_buffer_stats():
+    """Get write-behind queue statistics, including dropped events"""
+    return read_buffer.stats()
+
+@router.get("/cache", response_model=schemas.ReadCacheStats)
+def get_read_cache_stats():
+    """Get already-read cache hit and miss counters"""
+    return read_cache.stats()
 
 @router.get("/status/{meeting_id}", response_model=List[schemas.RecipientResponse])
-def get_meeting_read_status(meeting_id: int, db: Session = Depends(get_db)):
-    """Get read status for all recipients of a meeting"""
-    meeting = crud.get_meeting(db, meeting_id)
+async def get_meeting_read_status(
+    meeting_id: int,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = Depends(cursor_param),
+    db=Depends(get_db_session)
+):
+    """
+    Get read status for the recipients of a meeting. Without limit or cursor every
+    recipient is returned; with either, pages hold at most limit (default
+    1000) rows and the X-Next-Cursor header points to the next page.
+    """
+    meeting = await async_crud.run(db, crud.get_meeting, meeting_id)
+    if not meeting:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    
+    limit = optional_page_limit(limit, after)
+    recipients = await async_crud.run(db, crud.get_meeting_recipients, meeting_id, after=after, limit=limit)
+    set_next_cursor(response, recipients, limit, "userId")
+    return recipients
+
+@router.get("/export/{meeting_id}")
+async def export_meeting_read_status(
+    meeting_id: int,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    db=Depends(get_db_session)
+):
+    """
+    Stream read status for every recipient of a meeting as NDJSON or CSV.
+    Rows are written as they come off the database cursor, so memory use
+    does not grow with the size of the meeting.
+    """
+    meeting = await async_crud.run(db, crud.get_meeting, meeting_id)
     if not meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
     
-    return crud.get_meeting_recipients(db, meeting_id)
+    return StreamingResponse(
+        stream_recipient_export(meeting_id, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="meeting-{meeting_id}-recipients.{format}"'}
+    )
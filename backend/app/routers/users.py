@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from .. import crud, schemas
 from ..database import get_db
+from ..pagination import cursor_param, set_next_cursor, MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+# Upper bound on rows accepted by the bulk endpoint
+BULK_MAX_ITEMS = 10000
+
 @router.post("/", response_model=schemas.UserResponse)
 def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
     """Create a new user"""
@@ -14,10 +18,25 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Email already registered")
     return crud.create_user(db=db, user=user)
 
+@router.post("/bulk", response_model=List[schemas.UserBulkResult])
+def create_users_bulk(users: List[schemas.UserCreate], db: Session = Depends(get_db)):
+    """Create many users in one transaction; existing emails are reported, not duplicated"""
+    if len(users) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ITEMS} users per request")
+    return crud.create_users_bulk(db, users)
+
 @router.get("/", response_model=List[schemas.UserResponse])
-def list_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get list of all users"""
-    return crud.get_users(db, skip=skip, limit=limit)
+def list_users(
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = Depends(cursor_param),
+    db: Session = Depends(get_db)
+):
+    """Get list of all users; follow the X-Next-Cursor header for the next page"""
+    users = crud.get_users(db, skip=skip, limit=limit, after=after)
+    set_next_cursor(response, users, limit, "userId")
+    return users
 
 @router.get("/{user_id}", response_model=schemas.UserResponse)
 def get_user(user_id: int, db: Session = Depends(get_db)):
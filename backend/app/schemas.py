@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from datetime import datetime
+from datetime import datetime, date
 from typing import Optional, List
 from enum import Enum
 
@@ -87,6 +87,33 @@ class RecipientResponse(RecipientBase):
     class Config:
         from_attributes = True
 
+# Bulk creation schemas
+class BulkStatus(str, Enum):
+    CREATED = "created"
+    EXISTS = "exists"
+    MEETING_NOT_FOUND = "meeting_not_found"
+    USER_NOT_FOUND = "user_not_found"
+
+class UserBulkResult(BaseModel):
+    index: int
+    email: str
+    status: BulkStatus
+    userId: Optional[int] = None
+
+class RecipientBulkResult(BaseModel):
+    index: int
+    meetingId: int
+    userId: int
+    status: BulkStatus
+    id: Optional[int] = None
+
+# Mail merge schemas
+class MailingListEntry(BaseModel):
+    userId: int
+    name: str
+    email: str
+    trackingToken: str
+
 # Analytics schemas
 class MeetingAnalytics(BaseModel):
     meetingId: int
@@ -112,8 +139,77 @@ class OverviewAnalytics(BaseModel):
     total_reads: int
     overall_read_percentage: float
 
+class DailyOpens(BaseModel):
+    date: date
+    opens: int
+    unique_openers: int
+    repeat_opens: int
+
+class MeetingOpenAnalytics(BaseModel):
+    meetingId: int
+    total_opens: int
+    unique_openers: int
+    repeat_opens: int
+    first_open_at: Optional[datetime] = None
+    last_open_at: Optional[datetime] = None
+    daily: List[DailyOpens] = []
+
+class TimelineGranularity(str, Enum):
+    MINUTE = "minute"
+    HOUR = "hour"
+    DAY = "day"
+
+class TimelineBucket(BaseModel):
+    bucket_start: datetime
+    reads: int
+
+class TimeToOpenBucket(BaseModel):
+    bucket: str
+    count: int
+
+class ReadTimeline(BaseModel):
+    meetingId: Optional[int] = None
+    granularity: TimelineGranularity
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    total_reads: int
+    buckets: List[TimelineBucket] = []
+    time_to_open: List[TimeToOpenBucket] = []
+
 # Response schemas
 class TrackingResponse(BaseModel):
     success: bool
     message: str
     already_read: bool = False
+
+class ReadBufferStats(BaseModel):
+    enabled: bool
+    queue_depth: int
+    enqueued: int
+    flushed: int
+    dropped: int
+    failed: int
+    batches: int
+    flush_interval: float
+    batch_size: int
+
+class ReadCacheStats(BaseModel):
+    enabled: bool
+    size: int
+    capacity: int
+    hits: int
+    misses: int
+    evictions: int
+    hit_ratio: float
+
+class AnalyticsCacheStats(BaseModel):
+    enabled: bool
+    backend: str
+    ttl: float
+    size: Optional[int] = None
+    hits: int
+    misses: int
+    invalidations: int
+    stale_writes: int
+    evictions: int
+    hit_ratio: float
@@ -0,0 +1,87 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import logging
+import os
+import struct
+import time
+from functools import lru_cache
+from typing import Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Signed tracking token configuration
+TOKEN_TTL = int(os.getenv("TRACKING_TOKEN_TTL", str(180 * 24 * 3600)))
+# Local development only: sign with a public constant when no secret is set
+ALLOW_INSECURE_SECRET = os.getenv("TRACKING_ALLOW_INSECURE_SECRET", "false").lower() in ("1", "true", "yes")
+INSECURE_SECRET = "insecure-development-secret"
+
+# meetingId, userId, expiry (unix seconds) followed by a truncated HMAC-SHA256
+_PAYLOAD = struct.Struct(">QQI")
+_MAC_SIZE = 16
+_TOKEN_SIZE = _PAYLOAD.size + _MAC_SIZE
+
+class InvalidToken(ValueError):
+    """Token is malformed or its signature does not match"""
+
+class ExpiredToken(InvalidToken):
+    """Token signature is valid but the expiry has passed"""
+
+class MissingSecret(RuntimeError):
+    """Neither TRACKING_SECRET nor SECRET_KEY is configured"""
+
+@lru_cache(maxsize=None)
+def tracking_secret() -> str:
+    """
+    Secret used to sign and verify tracking tokens: TRACKING_SECRET, else
+    SECRET_KEY. Raises MissingSecret when neither is set, unless
+    TRACKING_ALLOW_INSECURE_SECRET opts into the public development secret.
+    """
+    secret = os.getenv("TRACKING_SECRET") or os.getenv("SECRET_KEY")
+    if secret:
+        return secret
+    if ALLOW_INSECURE_SECRET:
+        logger.warning("TRACKING_SECRET/SECRET_KEY not set; signing tracking tokens with the insecure development secret")
+        return INSECURE_SECRET
+    raise MissingSecret(
+        "Set TRACKING_SECRET (or SECRET_KEY) to sign tracking tokens, "
+        "or TRACKING_ALLOW_INSECURE_SECRET=1 for local development"
+    )
+
+def _mac(payload: bytes, secret: str) -> bytes:
+    return hmac.new(secret.encode(), payload, hashlib.sha256).digest()[:_MAC_SIZE]
+
+def sign_tracking_token(meeting_id: int, user_id: int, ttl: Optional[int] = None,
+                        secret: Optional[str] = None, now: Optional[float] = None) -> str:
+    """Encode meeting, user and expiry into a compact URL-safe HMAC token"""
+    expires_at = int((now if now is not None else time.time()) + (ttl if ttl is not None else TOKEN_TTL))
+    payload = _PAYLOAD.pack(meeting_id, user_id, expires_at)
+    token = payload + _mac(payload, secret or tracking_secret())
+    return base64.urlsafe_b64encode(token).rstrip(b"=").decode()
+
+def verify_tracking_token(token: str, secret: Optional[str] = None,
+                          now: Optional[float] = None) -> Tuple[int, int]:
+    """
+    Return (meeting_id, user_id) for a valid token using only CPU work.
+    Raises InvalidToken for forged or malformed tokens and ExpiredToken
+    for tokens past their expiry.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    except (binascii.Error, ValueError):
+        raise InvalidToken("Malformed token")
+    if len(raw) != _TOKEN_SIZE:
+        raise InvalidToken("Malformed token")
+
+    payload, mac = raw[:_PAYLOAD.size], raw[_PAYLOAD.size:]
+    if not hmac.compare_digest(mac, _mac(payload, secret or tracking_secret())):
+        raise InvalidToken("Bad signature")
+
+    meeting_id, user_id, expires_at = _PAYLOAD.unpack(payload)
+    if expires_at < (now if now is not None else time.time()):
+        raise ExpiredToken("Token expired")
+    return meeting_id, user_id
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Generate a large synthetic dataset directly through the SQLAlchemy engine.
+
+Unlike setup_data.py, which goes through the HTTP API one row at a time, this
+writes users, meetings and recipients with batched executemany inserts and
+then rebuilds the counter tables, so millions of recipient rows take minutes.
+
+Usage:
+    python generate_data.py                                  # 10k users, 1k meetings x 1k recipients
+    python generate_data.py --users 100000 --meetings 5000 --recipients-per-meeting 1000
+    python generate_data.py --read-ratio 0.4 --days 90 --open-events --seed 7
+
+The same --seed and --reference-time against an empty database always
+produce the same rows. Timestamps fall in the --days before the reference
+time (default 2025-01-01T00:00Z); pass --reference-time now for recent data.
+Generated users and meetings get ids after the current maximum, so the script
+can also be run against a database that already has data.
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, select, text
+from app import crud, models
+from app.database import engine, SessionLocal
+from app.migrations import run_migrations
+
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_1 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148",
+    "Microsoft Office/16.0 (Windows NT 10.0; Microsoft Outlook 16.0.17029; Pro)",
+    "Mozilla/5.0 (Windows NT 5.1; rv:11.0) Gecko Firefox/11.0 (via ggpht.com GoogleImageProxy)",
+]
+
+FIRST_NAMES = ["John", "Jane", "Michael", "Emily", "Robert", "Sarah", "David", "Lisa", "James", "Jennifer"]
+LAST_NAMES = ["Doe", "Smith", "Johnson", "Davis", "Wilson", "Brown", "Lee", "Anderson", "Taylor", "Martinez"]
+MEETING_TOPICS = ["Strategy Planning", "Team Standup", "Product Review", "Budget Review", "All Hands", "Retrospective"]
+
+def parse_reference_time(value: str) -> datetime:
+    """ISO 8601 time (UTC when no offset is given), or "now" for the current hour"""
+    if value == "now":
+        return datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    try:
+        reference = datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid ISO 8601 time: {value!r}")
+    if reference.tzinfo is None:
+        reference = reference.replace(tzinfo=timezone.utc)
+    return reference.astimezone(timezone.utc)
+
+def _insert_batches(table, rows, batch_size: int) -> int:
+    """Insert rows from an iterable in executemany batches, one transaction per batch"""
+    inserted = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            with engine.begin() as conn:
+                conn.execute(table.insert(), batch)
+            inserted += len(batch)
+            batch = []
+    if batch:
+        with engine.begin() as conn:
+            conn.execute(table.insert(), batch)
+        inserted += len(batch)
+    return inserted
+
+def _next_id(column) -> int:
+    with engine.connect() as conn:
+        return (conn.execute(select(func.max(column))).scalar() or 0) + 1
+
+def _reset_sequences():
+    # Explicit ids do not advance PostgreSQL serial sequences
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        for table, column in (("user", "userId"), ("meeting", "meetingId")):
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('\"{table}\"', '{column}'), "
+                f"(SELECT MAX(\"{column}\") FROM \"{table}\"))"
+            ))
+
+def generate_users(rng: random.Random, first_id: int, count: int, seed: int, now: datetime):
+    for user_id in range(first_id, first_id + count):
+        yield {
+            "userId": user_id,
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "email": f"user{user_id}.s{seed}@example.com",
+            "created_at": now,
+        }
+
+def generate_meetings(rng: random.Random, first_id: int, count: int, days: float, now: datetime):
+    """Meetings with created_at spread uniformly over the last `days` days"""
+    meetings = []
+    for meeting_id in range(first_id, first_id + count):
+        created_at = now - timedelta(seconds=rng.uniform(0, days * 86400))
+        meetings.append({
+            "meetingId": meeting_id,
+            "title": f"{rng.choice(MEETING_TOPICS)} #{meeting_id}",
+            "contentLocation": f"https://company.com/meetings/{meeting_id}",
+            "created_at": created_at,
+        })
+    return meetings
+
+def generate_recipients(rng: random.Random, meetings, first_user_id: int, users: int,
+                        per_meeting: int, read_ratio: float, sent_ratio: float,
+                        mean_time_to_open: float, now: datetime, opens: list = None):
+    """
+    Recipient rows for each meeting: a random sample of users, of which
+    read_ratio have read the email and sent_ratio were sent but not read.
+    Time to open is exponential with the given mean (seconds), capped at now.
+    Read opens are appended to `opens` when it is given.
+    """
+    per_meeting = min(per_meeting, users)
+    for meeting in meetings:
+        meeting_id = meeting["meetingId"]
+        sent_at = meeting["created_at"]
+        for offset in sorted(rng.sample(range(users), per_meeting)):
+            user_id = first_user_id + offset
+            roll = rng.random()
+            if roll < read_ratio:
+                read_at = min(now, sent_at + timedelta(seconds=rng.expovariate(1 / mean_time_to_open)))
+                user_agent = rng.choice(USER_AGENTS)
+                ip_address = f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}"
+                if opens is not None:
+                    opens.append((meeting_id, user_id, read_at, user_agent, ip_address))
+                yield {
+                    "meetingId": meeting_id, "userId": user_id, "status": "EMAIL_READ",
+                    "read_at": read_at, "user_agent": user_agent, "ip_address": ip_address,
+                    "created_at": sent_at, "updated_at": read_at,
+                }
+            else:
+                yield {
+                    "meetingId": meeting_id, "userId": user_id,
+                    "status": "EMAIL_SENT" if roll < read_ratio + sent_ratio else "EMAIL_CREATED",
+                    "read_at": None, "user_agent": None, "ip_address": None,
+                    "created_at": sent_at, "updated_at": None,
+                }
+
+def generate_open_events(rng: random.Random, opens, repeat_ratio: float, now: datetime):
+    """One open event per read, plus repeat opens for repeat_ratio of them"""
+    for meeting_id, user_id, read_at, user_agent, ip_address in opens:
+        opened_at = read_at
+        while True:
+            yield {
+                "meetingId": meeting_id, "userId": user_id,
+                "opened_at": opened_at, "open_date": opened_at.date(),
+                "user_agent": user_agent, "ip_address": ip_address,
+            }
+            if rng.random() >= repeat_ratio:
+                break
+            opened_at = min(now, opened_at + timedelta(seconds=rng.expovariate(1 / 3600)))
+
+def _progress(label: str, count: int, started: float):
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed else 0
+    print(f"✓ {label}: {count:,} rows in {elapsed:.1f}s ({rate:,.0f} rows/s)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a large synthetic Email Read Tracking dataset")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--meetings", type=int, default=1000)
+    parser.add_argument("--recipients-per-meeting", type=int, default=1000)
+    parser.add_argument("--read-ratio", type=float, default=0.6, help="fraction of recipients that read the email")
+    parser.add_argument("--sent-ratio", type=float, default=0.3, help="fraction sent but not read; the rest are created")
+    parser.add_argument("--days", type=float, default=30, help="spread meeting send times over this many past days")
+    parser.add_argument("--mean-time-to-open", type=float, default=6, help="mean hours from send to first open")
+    parser.add_argument("--open-events", action="store_true", help="also write open events and roll them up")
+    parser.add_argument("--repeat-open-ratio", type=float, default=0.3, help="chance a read is opened again")
+    parser.add_argument("--batch-size", type=int, default=10000, help="rows per executemany batch")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reference-time", type=parse_reference_time, default="2025-01-01T00:00:00Z",
+                        help="generated timestamps end at this ISO 8601 time, or 'now'")
+    args = parser.parse_args()
+    if args.read_ratio < 0 or args.sent_ratio < 0 or args.read_ratio + args.sent_ratio > 1:
+        parser.error("--read-ratio and --sent-ratio must be non-negative and sum to at most 1")
+
+    run_migrations()
+    rng = random.Random(args.seed)
+    # Fixed by default so the same seed gives the same timestamps
+    now = args.reference_time
+    first_user_id = _next_id(models.User.userId)
+    first_meeting_id = _next_id(models.Meeting.meetingId)
+    total_started = time.perf_counter()
+
+    started = time.perf_counter()
+    count = _insert_batches(
+        models.User.__table__,
+        generate_users(rng, first_user_id, args.users, args.seed, now),
+        args.batch_size
+    )
+    _progress("Users", count, started)
+
+    started = time.perf_counter()
+    meetings = generate_meetings(rng, first_meeting_id, args.meetings, args.days, now)
+    count = _insert_batches(models.Meeting.__table__, meetings, args.batch_size)
+    _progress("Meetings", count, started)
+    _reset_sequences()
+
+    started = time.perf_counter()
+    opens = [] if args.open_events else None
+    count = _insert_batches(
+        models.Recipient.__table__,
+        generate_recipients(
+            rng, meetings, first_user_id, args.users, args.recipients_per_meeting,
+            args.read_ratio, args.sent_ratio, args.mean_time_to_open * 3600, now, opens
+        ),
+        args.batch_size
+    )
+    _progress("Recipients", count, started)
+
+    db = SessionLocal()
+    try:
+        if opens is not None:
+            started = time.perf_counter()
+            count = _insert_batches(
+                models.EmailOpenEvent.__table__,
+                generate_open_events(rng, opens, args.repeat_open_ratio, now),
+                args.batch_size
+            )
+            _progress("Open events", count, started)
+            started = time.perf_counter()
+            crud.rollup_open_events(db)
+            print(f"✓ Rolled up open events in {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        crud.rebuild_counters(db)
+        print(f"✓ Counters rebuilt in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+
+    print(f"\n🎉 Done in {time.perf_counter() - total_started:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Load generator for the Email Read Tracking API.
+
+Replays a weighted mix of requests at a fixed target rate (open loop) and
+prints a JSON report with latency percentiles, throughput and error rates.
+
+Usage:
+    python loadtest.py                                   # in-process against the ASGI app
+    python loadtest.py --base-url http://localhost:8000  # against a running server
+    python loadtest.py --rate 500 --duration 60 --mix pixel=85,create=5,analytics=10
+    python loadtest.py --output before.json
+
+Scenarios:
+    pixel        GET /track/email/{meetingId}/{userId} for a seeded recipient
+    pixel_token  GET /track/t/{token} with a signed tracking token
+    create       POST /recipients/ for a random meeting/user pair
+    analytics    GET /analytics/meeting/{meetingId} or /analytics/overview
+
+Latency is measured from each request's scheduled start, so time spent
+waiting for a free connection when the server falls behind is included
+(no coordinated omission).
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+import httpx
+
+DEFAULT_MIX = "pixel=80,create=5,analytics=15"
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parse "name=weight,..." into a weight per scenario"""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Unknown scenario {name!r}; expected one of {', '.join(SCENARIOS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+class Workload:
+    """Seeded users, meetings and recipients the scenarios pick targets from"""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.user_ids: List[int] = []
+        self.meeting_ids: List[int] = []
+        self.recipients: List[Tuple[int, int]] = []
+
+    async def seed(self, client: httpx.AsyncClient, users: int, meetings: int,
+                   recipients_per_meeting: int, run_id: str):
+        """Create the target data through the bulk endpoints"""
+        for start in range(0, users, 5000):
+            batch = [
+                {"name": f"Load Test {i}", "email": f"loadtest-{run_id}-{i}@example.com"}
+                for i in range(start, min(users, start + 5000))
+            ]
+            response = await client.post("/users/bulk", json=batch)
+            response.raise_for_status()
+            self.user_ids.extend(row["userId"] for row in response.json())
+
+        for i in range(meetings):
+            response = await client.post("/meetings/", json={"title": f"Load test {run_id} #{i}"})
+            response.raise_for_status()
+            self.meeting_ids.append(response.json()["meetingId"])
+
+        per_meeting = min(recipients_per_meeting, len(self.user_ids))
+        pairs = [
+            {"meetingId": meeting_id, "userId": user_id}
+            for meeting_id in self.meeting_ids
+            for user_id in self.rng.sample(self.user_ids, per_meeting)
+        ]
+        for start in range(0, len(pairs), 5000):
+            response = await client.post("/recipients/bulk", json=pairs[start:start + 5000])
+            response.raise_for_status()
+        self.recipients = [(pair["meetingId"], pair["userId"]) for pair in pairs]
+
+async def scenario_pixel(client: httpx.AsyncClient, workload: Workload):
+    meeting_id, user_id = workload.rng.choice(workload.recipients)
+    return await client.get(f"/track/email/{meeting_id}/{user_id}")
+
+async def scenario_pixel_token(client: httpx.AsyncClient, workload: Workload):
+    from app.tokens import sign_tracking_token
+    meeting_id, user_id = workload.rng.choice(workload.recipients)
+    return await client.get(f"/track/t/{sign_tracking_token(meeting_id, user_id)}")
+
+async def scenario_create(client: httpx.AsyncClient, workload: Workload):
+    return await client.post("/recipients/", json={
+        "meetingId": workload.rng.choice(workload.meeting_ids),
+        "userId": workload.rng.choice(workload.user_ids),
+    })
+
+async def scenario_analytics(client: httpx.AsyncClient, workload: Workload):
+    if workload.rng.random() < 0.2:
+        return await client.get("/analytics/overview")
+    return await client.get(f"/analytics/meeting/{workload.rng.choice(workload.meeting_ids)}")
+
+SCENARIOS = {
+    "pixel": scenario_pixel,
+    "pixel_token": scenario_pixel_token,
+    "create": scenario_create,
+    "analytics": scenario_analytics,
+}
+
+class Recorder:
+    """Latency samples and outcomes per scenario"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+        self.status_codes: Dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, scenario: str, latency: float, status):
+        self.latencies[scenario].append(latency)
+        self.status_codes[scenario][str(status)] += 1
+        if not isinstance(status, int) or status >= 400:
+            self.errors[scenario] += 1
+
+    def _summary(self, latencies: List[float], errors: int, elapsed: float) -> dict:
+        ordered = sorted(latencies)
+        count = len(ordered)
+        return {
+            "requests": count,
+            "errors": errors,
+            "error_rate": round(errors / count, 4) if count else 0.0,
+            "throughput_rps": round(count / elapsed, 2) if elapsed else 0.0,
+            "latency_ms": {
+                "mean": round(sum(ordered) / count * 1000, 3) if count else 0.0,
+                "p50": round(percentile(ordered, 0.50) * 1000, 3),
+                "p95": round(percentile(ordered, 0.95) * 1000, 3),
+                "p99": round(percentile(ordered, 0.99) * 1000, 3),
+                "max": round(ordered[-1] * 1000, 3) if count else 0.0,
+            },
+        }
+
+    def report(self, elapsed: float) -> dict:
+        all_latencies = [latency for values in self.latencies.values() for latency in values]
+        return {
+            "overall": self._summary(all_latencies, sum(self.errors.values()), elapsed),
+            "scenarios": {
+                scenario: {
+                    **self._summary(latencies, self.errors[scenario], elapsed),
+                    "status_codes": dict(self.status_codes[scenario]),
+                }
+                for scenario, latencies in sorted(self.latencies.items())
+            },
+        }
+
+async def _timed_request(client, workload, scenario, scheduled_at, recorder, semaphore):
+    async with semaphore:
+        try:
+            response = await SCENARIOS[scenario](client, workload)
+            status = response.status_code
+        except httpx.HTTPError as exc:
+            status = type(exc).__name__
+    recorder.record(scenario, time.perf_counter() - scheduled_at, status)
+
+async def run_load(client: httpx.AsyncClient, workload: Workload, weights: Dict[str, float],
+                   rate: float, duration: float, concurrency: int, recorder: Recorder) -> dict:
+    """Issue requests at a fixed rate for the given duration; returns schedule stats"""
+    names = list(weights)
+    scenario_weights = list(weights.values())
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = set()
+    interval = 1.0 / rate
+    start = time.perf_counter()
+    sent = 0
+    max_lag = 0.0
+    while True:
+        scheduled_at = start + sent * interval
+        if scheduled_at - start >= duration:
+            break
+        now = time.perf_counter()
+        if scheduled_at > now:
+            await asyncio.sleep(scheduled_at - now)
+        else:
+            max_lag = max(max_lag, now - scheduled_at)
+        scenario = workload.rng.choices(names, weights=scenario_weights)[0]
+        task = asyncio.create_task(
+            _timed_request(client, workload, scenario, scheduled_at, recorder, semaphore)
+        )
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        sent += 1
+    if tasks:
+        await asyncio.gather(*tasks)
+    return {
+        "elapsed_s": round(time.perf_counter() - start, 3),
+        "scheduled": sent,
+        "max_schedule_lag_ms": round(max_lag * 1000, 3),
+    }
+
+async def main_async(args) -> dict:
+    rng = random.Random(args.seed)
+    weights = args.mix
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    app = None
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout)
+    else:
+        from app.main import app
+        await app.router.startup()
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=args.timeout
+        )
+
+    try:
+        workload = Workload(rng)
+        print(f"Seeding {args.users} users, {args.meetings} meetings...", file=sys.stderr)
+        await workload.seed(client, args.users, args.meetings, args.recipients_per_meeting,
+                            run_id=f"{args.seed}-{int(time.time())}")
+
+        if args.warmup > 0:
+            print(f"Warming up for {args.warmup}s...", file=sys.stderr)
+            await run_load(client, workload, weights, args.rate, args.warmup, args.concurrency, Recorder())
+
+        print(f"Running {args.rate} req/s for {args.duration}s...", file=sys.stderr)
+        recorder = Recorder()
+        schedule = await run_load(client, workload, weights, args.rate, args.duration, args.concurrency, recorder)
+    finally:
+        await client.aclose()
+        if app is not None:
+            await app.router.shutdown()
+
+    return {
+        "config": {
+            "target": args.base_url or "in-process",
+            "rate": args.rate,
+            "duration_s": args.duration,
+            "concurrency": args.concurrency,
+            "mix": weights,
+            "seed": args.seed,
+            "users": args.users,
+            "meetings": args.meetings,
+            "recipients_per_meeting": args.recipients_per_meeting,
+        },
+        "schedule": schedule,
+        **recorder.report(schedule["elapsed_s"]),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Email Read Tracking API")
+    parser.add_argument("--base-url", help="server to target; omit to run in-process against app.main:app")
+    parser.add_argument("--rate", type=float, default=200, help="target requests per second")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of measured load")
+    parser.add_argument("--warmup", type=float, default=2, help="seconds of unmeasured load first")
+    parser.add_argument("--concurrency", type=int, default=100, help="maximum requests in flight")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help=f"scenario weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--meetings", type=int, default=50)
+    parser.add_argument("--recipients-per-meeting", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=10.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for data and request order")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+if __name__ == "__main__":
+    main()
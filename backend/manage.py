@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Maintenance commands for the Email Read Tracking database.
+
+Usage:
+    python manage.py migrate
+    python manage.py rebuild-counters
+    python manage.py rollup
+    python manage.py rollup --every 60    # keep rolling up until stopped
+"""
+
+import argparse
+import logging
+import time
+from app import crud
+from app.database import SessionLocal
+from app.migrations import run_migrations, prepare_database
+
+def migrate(args):
+    """Create missing tables, apply pending schema migrations and backfill counters"""
+    applied = prepare_database()
+    if applied:
+        print(f"✓ Applied migrations: {', '.join(str(version) for version in applied)}")
+    else:
+        print("✓ Schema is up to date")
+
+def rebuild_counters(args):
+    """Recompute the meeting and user counter tables from recipients"""
+    db = SessionLocal()
+    try:
+        crud.rebuild_counters(db)
+    finally:
+        db.close()
+    print("✓ Counters rebuilt")
+
+def rollup_once() -> int:
+    db = SessionLocal()
+    try:
+        return crud.rollup_open_events(db)
+    finally:
+        db.close()
+
+def rollup(args):
+    """Fold new open events into the daily and per-meeting rollups"""
+    if not args.every:
+        print(f"✓ Rolled up {rollup_once()} open events")
+        return
+    # Long-running mode used by run.py --prod: the single rollup process
+    try:
+        while True:
+            try:
+                folded = rollup_once()
+                if folded:
+                    print(f"✓ Rolled up {folded} open events", flush=True)
+            except Exception:
+                logging.exception("Open event rollup failed")
+            time.sleep(args.every)
+    except KeyboardInterrupt:
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description="Email Read Tracking maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    subparsers.add_parser("migrate", help=migrate.__doc__).set_defaults(func=migrate)
+    subparsers.add_parser("rebuild-counters", help=rebuild_counters.__doc__).set_defaults(func=rebuild_counters)
+    rollup_parser = subparsers.add_parser("rollup", help=rollup.__doc__)
+    rollup_parser.add_argument("--every", type=float, default=0,
+                               help="repeat every N seconds until stopped")
+    rollup_parser.set_defaults(func=rollup)
+    
+    args = parser.parse_args()
+    if args.func is not migrate:
+        run_migrations()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,187 @@
+#!/usr/bin/env python3
+"""
+Run the Email Read Tracking API.
+
+Usage:
+    python run.py                  # development: one worker, auto-reload
+    python run.py --prod           # production: migrate once, then N workers
+    python run.py --prod --workers 8 --port 8080
+
+Production mode applies migrations once in the parent process, then starts
+WEB_CONCURRENCY (default: CPU count) workers with uvloop and httptools when
+installed. With gunicorn installed the app is preloaded in the master and
+forked into UvicornWorker processes; otherwise uvicorn's own process manager
+is used. SIGTERM drains in-flight requests and flushes queued tracking events
+for up to --graceful-timeout seconds.
+
+The open event rollup runs in one dedicated `manage.py rollup --every`
+process rather than in every worker. With more than one worker the
+in-process read cache is turned off, and the analytics cache is turned off
+unless ANALYTICS_CACHE_BACKEND=redis shares it between workers. /metrics
+aggregates all workers through prometheus_client's multiprocess mode.
+"""
+
+import argparse
+import importlib.util
+import logging
+import os
+import subprocess
+import sys
+import tempfile
 import uvicorn
-from app.main import app
+from dotenv import load_dotenv
 
-if __name__ == "__main__":
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+logger = logging.getLogger("run")
+
+def _available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+def run_dev(args):
     uvicorn.run(
         "app.main:app",
-        host="0.0.0.0",
-        port=8000,
+        host=args.host,
+        port=args.port,
         reload=True,
         reload_dirs=["app"]
     )
+
+def run_gunicorn(args, worker_class: str):
+    from gunicorn.app.base import BaseApplication
+
+    class Application(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{args.host}:{args.port}")
+            self.cfg.set("workers", args.workers)
+            self.cfg.set("worker_class", worker_class)
+            self.cfg.set("preload_app", True)
+            self.cfg.set("graceful_timeout", args.graceful_timeout)
+            self.cfg.set("keepalive", args.keepalive)
+            self.cfg.set("post_fork", _post_fork)
+            self.cfg.set("child_exit", _child_exit)
+
+        def load(self):
+            from app.main import app
+            return app
+
+    Application().run()
+
+def _post_fork(server, worker):
+    # Connections opened in the master while preloading must not be shared
+    # with the forked worker; drop them without closing the master's sockets
+    from app.database import engine
+    engine.dispose(close=False)
+
+def _child_exit(server, worker):
+    from app.metrics import mark_process_dead
+    mark_process_dead(worker.pid)
+
+def run_uvicorn(args, loop: str, http: str):
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=loop,
+        http=http,
+        timeout_keep_alive=args.keepalive,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        proxy_headers=True
+    )
+
+def configure_workers(args):
+    """Environment for the workers; set before any app module is imported"""
+    # Workers skip migrations (run once below) and the rollup (one dedicated process)
+    os.environ["RUN_MIGRATIONS_ON_STARTUP"] = "false"
+    os.environ["OPEN_EVENTS_ROLLUP_IN_APP"] = "false"
+    if args.workers > 1:
+        # Per-process caches would miss invalidations made by other workers
+        if os.getenv("READ_CACHE_ENABLED", "true").lower() in ("1", "true", "yes"):
+            logger.warning("Read cache disabled with %d workers: a status change in one worker "
+                           "would not reach the others, so repeat pixel hits query the database",
+                           args.workers)
+            os.environ["READ_CACHE_ENABLED"] = "false"
+        if os.getenv("ANALYTICS_CACHE_BACKEND", "memory") == "memory":
+            logger.warning("In-process analytics cache disabled with %d workers; "
+                           "set ANALYTICS_CACHE_BACKEND=redis to share one", args.workers)
+            os.environ["ANALYTICS_CACHE_BACKEND"] = "none"
+        configure_metrics(args)
+
+def configure_metrics(args):
+    """Share /metrics across workers through prometheus_client's multiprocess files"""
+    if os.getenv("METRICS_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return
+    directory = os.environ.setdefault(
+        "PROMETHEUS_MULTIPROC_DIR",
+        os.path.join(tempfile.gettempdir(), f"email-tracking-metrics-{os.getpid()}")
+    )
+    # Files left by a previous run would be added to this run's totals
+    os.makedirs(directory, exist_ok=True)
+    for name in os.listdir(directory):
+        if name.endswith(".db"):
+            os.unlink(os.path.join(directory, name))
+
+def start_rollup_process():
+    """Start the single open event rollup process, if open events are enabled"""
+    from app.open_events import OPEN_EVENTS_ENABLED, ROLLUP_INTERVAL
+    if not OPEN_EVENTS_ENABLED or ROLLUP_INTERVAL <= 0:
+        return None
+    logger.info("Starting open event rollup process (every %ss)", ROLLUP_INTERVAL)
+    return subprocess.Popen(
+        [sys.executable, "manage.py", "rollup", "--every", str(ROLLUP_INTERVAL)],
+        cwd=BASE_DIR
+    )
+
+def run_prod(args):
+    configure_workers(args)
+
+    # One-shot migrate step; workers skip migrations in their startup hook
+    if not args.skip_migrate:
+        from app.migrations import prepare_database
+        applied = prepare_database()
+        logger.info("Applied migrations: %s", applied or "none")
+
+    loop = "uvloop" if _available("uvloop") else "asyncio"
+    http = "httptools" if _available("httptools") else "h11"
+    rollup_process = start_rollup_process()
+    try:
+        if _available("gunicorn"):
+            worker_class = (
+                "uvicorn.workers.UvicornWorker" if loop == "uvloop" and http == "httptools"
+                else "uvicorn.workers.UvicornH11Worker"
+            )
+            logger.info("Starting %d gunicorn workers (%s, preloaded)", args.workers, worker_class)
+            run_gunicorn(args, worker_class)
+        else:
+            logger.info("Starting %d uvicorn workers (loop=%s, http=%s)", args.workers, loop, http)
+            run_uvicorn(args, loop, http)
+    finally:
+        if rollup_process is not None:
+            rollup_process.terminate()
+            rollup_process.wait(timeout=args.graceful_timeout)
+
+def main():
+    # Before the argparse defaults below read HOST, PORT, WEB_CONCURRENCY, ...
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Run the Email Read Tracking API")
+    parser.add_argument("--prod", action="store_true", help="multi-worker production mode")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int,
+                        default=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))))
+    parser.add_argument("--graceful-timeout", type=int, default=int(os.getenv("GRACEFUL_TIMEOUT", "30")),
+                        help="seconds to finish in-flight requests on shutdown")
+    parser.add_argument("--keepalive", type=int, default=int(os.getenv("KEEPALIVE", "5")))
+    parser.add_argument("--skip-migrate", action="store_true",
+                        help="do not run the one-shot migrate step (run manage.py migrate separately)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
+    if args.prod:
+        run_prod(args)
+    else:
+        run_dev(args)
+
+if __name__ == "__main__":
+    main()
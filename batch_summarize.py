@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Summarize a directory of meeting transcripts.
+
+Usage:
+    python batch_summarize.py transcripts/ --out summaries/
+    python batch_summarize.py transcripts/ --out summaries/ --concurrency 16 --rpm 600 --tpm 200000
+    python batch_summarize.py transcripts/ --out summaries/ --stub    # offline, no API calls
+
+Each transcript gets <out>/<relative path>.json (the summary plus the source
+hash) and <out>/<relative path>.html (the rendered email), written as soon
+as it finishes. When the model output is not a JSON object the transcript
+fails on its own and the raw output is kept in <relative path>.error.json. Re-running skips transcripts whose output is already there
+for the same content, so an interrupted run resumes where it stopped.
+
+Every model call, including each chunk of a long transcript, goes through
+token buckets for requests and tokens per minute, and is retried with
+exponential backoff (honouring Retry-After) when the API throttles.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from types import SimpleNamespace
+import httpx
+import openai
+from email_content import summarize_transcript, create_html_email_from_json, count_tokens, get_client, _parse_json
+
+# Output tokens assumed for a call before its real usage is known
+COMPLETION_TOKEN_ESTIMATE = 1000
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError,
+                    openai.InternalServerError)
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `per_minute` per minute.
+    acquire() blocks until the amount is available; the balance may go
+    negative when actual usage turns out higher than the amount acquired.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self._tokens = per_minute
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount: float = 1) -> float:
+        """Take `amount`, waiting as long as needed; returns the seconds waited"""
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+                delay = (amount - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def adjust(self, amount: float):
+        """Return (positive) or charge (negative) tokens after the fact"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+class BatchStats:
+    """Thread-safe counters for model calls across the batch"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {"calls": 0, "retries": 0, "throttled": 0, "tokens": 0, "rate_wait_s": 0.0}
+
+    def add(self, name: str, amount=1):
+        with self._lock:
+            self.counts[name] += amount
+
+class RateLimitedClient:
+    """
+    Wraps a chat client so every chat.completions.create call waits for the
+    request and token buckets and retries throttling and transient errors.
+    """
+
+    def __init__(self, client, requests: TokenBucket, tokens: TokenBucket, stats: BatchStats,
+                 max_retries: int = 6, base_delay: float = 1.0, max_delay: float = 60.0):
+        self._client = client
+        self._requests = requests
+        self._tokens = tokens
+        self._stats = stats
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _retry_delay(self, attempt: int, error) -> float:
+        response = getattr(error, "response", None)
+        headers = response.headers if response is not None else {}
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after", "").replace(".", "", 1).isdigit():
+            return float(headers["retry-after"])
+        # Full jitter keeps concurrent workers from retrying in lockstep
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _create(self, **kwargs):
+        estimate = sum(count_tokens(str(message.get("content", ""))) for message in kwargs.get("messages", []))
+        estimate += kwargs.get("max_tokens") or COMPLETION_TOKEN_ESTIMATE
+        for attempt in range(self.max_retries + 1):
+            waited = self._requests.acquire(1) + self._tokens.acquire(estimate)
+            self._stats.add("rate_wait_s", waited)
+            self._stats.add("calls")
+            try:
+                response = self._client.chat.completions.create(**kwargs)
+            except RETRYABLE_ERRORS as error:
+                if isinstance(error, openai.RateLimitError):
+                    self._stats.add("throttled")
+                if attempt == self.max_retries:
+                    raise
+                self._stats.add("retries")
+                time.sleep(self._retry_delay(attempt, error))
+                continue
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                self._tokens.adjust(estimate - usage.total_tokens)
+                self._stats.add("tokens", usage.total_tokens)
+            return response
+
+class StubClient:
+    """
+    Offline stand-in for the chat API: returns a summary built from the
+    prompt after a simulated latency, and throttles a fraction of calls.
+    With stream=True the first chunk arrives after `latency` and the rest
+    at `token_interval` seconds per chunk.
+    """
+
+    def __init__(self, latency: float = 0.2, throttle_rate: float = 0.0, seed: int = 0,
+                 token_interval: float = 0.0):
+        self.latency = latency
+        self.token_interval = token_interval
+        self.throttle_rate = throttle_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model, messages, temperature=None, stream=False, **kwargs):
+        with self._lock:
+            throttled = self._rng.random() < self.throttle_rate
+        time.sleep(self.latency)
+        if throttled:
+            request = httpx.Request("POST", "https://stub.invalid/chat/completions")
+            response = httpx.Response(429, headers={"retry-after-ms": "50"}, request=request)
+            raise openai.RateLimitError("Stub rate limit", response=response, body=None)
+
+        prompt = messages[-1]["content"]
+        transcript = prompt.split("Transcript", 1)[-1]
+        speakers = list(dict.fromkeys(re.findall(r"^\s*([A-Z][\w .'-]{0,40}):", transcript, re.MULTILINE)))
+        content = json.dumps({
+            "meeting_type": "Meeting",
+            "meeting_title": "Unknown",
+            "meeting_date": "Unknown",
+            "summary": f"Stub summary of {len(transcript.split())} words from {len(speakers)} speakers.",
+            "action_items": [
+                {"person": speaker, "task": "Follow up on the discussion", "deadline": "No information"}
+                for speaker in speakers[:5]
+            ],
+            "recipients": list(dict.fromkeys(re.findall(r"[\w.+-]+@[\w-]+\.[\w.-]+", transcript))),
+        })
+        tokens = count_tokens(prompt) + count_tokens(content)
+        if stream:
+            return self._stream(content)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(prompt_tokens=tokens - count_tokens(content),
+                                  completion_tokens=count_tokens(content), total_tokens=tokens),
+        )
+
+    def _stream(self, content: str, chunk_size: int = 4):
+        for start in range(0, len(content), chunk_size):
+            if start:
+                time.sleep(self.token_interval)
+            delta = SimpleNamespace(content=content[start:start + chunk_size])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None)
+
+def _write_atomic(path: str, data: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def find_transcripts(directory: str, pattern: str):
+    """Transcript paths under directory matching the glob, in a stable order"""
+    return sorted(str(path) for path in Path(directory).rglob(pattern) if path.is_file())
+
+def _output_base(path: str, source_dir: str, out_dir: str) -> str:
+    relative = os.path.relpath(path, source_dir)
+    return os.path.join(out_dir, os.path.splitext(relative)[0])
+
+def _is_done(json_path: str, sha256: str) -> bool:
+    try:
+        with open(json_path, encoding="utf-8") as f:
+            return json.load(f).get("sha256") == sha256
+    except (OSError, ValueError):
+        return False
+
+def process_transcript(path: str, source_dir: str, out_dir: str, client, use_cache: bool) -> str:
+    """Summarize one transcript and write its JSON and HTML; returns 'done', 'skipped' or 'failed'"""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    sha256 = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    base = _output_base(path, source_dir, out_dir)
+    if _is_done(base + ".json", sha256):
+        return "skipped"
+
+    content = summarize_transcript(text, use_cache=use_cache, client=client)
+    try:
+        summary = _parse_json(content)
+    except ValueError as exc:
+        summary, error = None, f"model output is not valid JSON: {exc}"
+    else:
+        error = None if isinstance(summary, dict) else "model output is not a JSON object"
+    if error:
+        _write_atomic(base + ".error.json", json.dumps({
+            "source": os.path.relpath(path, source_dir),
+            "sha256": sha256,
+            "error": error,
+            "output": content,
+        }, ensure_ascii=False, indent=2))
+        print(f"✗ {path}: {error}", file=sys.stderr)
+        return "failed"
+
+    _write_atomic(base + ".html", create_html_email_from_json(summary))
+    # JSON last: its presence marks the transcript as finished
+    _write_atomic(base + ".json", json.dumps({
+        "source": os.path.relpath(path, source_dir),
+        "sha256": sha256,
+        "summary": summary,
+    }, ensure_ascii=False, indent=2))
+    if os.path.exists(base + ".error.json"):
+        os.unlink(base + ".error.json")
+    return "done"
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a directory of meeting transcripts")
+    parser.add_argument("source", help="directory of transcripts")
+    parser.add_argument("--out", required=True, help="directory for the JSON and HTML results")
+    parser.add_argument("--pattern", default="*.txt", help="transcript file glob (searched recursively)")
+    parser.add_argument("--concurrency", type=int, default=8, help="transcripts summarized at once")
+    parser.add_argument("--rpm", type=float, default=float(os.getenv("SUMMARY_RPM", "300")),
+                        help="model requests per minute")
+    parser.add_argument("--tpm", type=float, default=float(os.getenv("SUMMARY_TPM", "150000")),
+                        help="model tokens per minute")
+    parser.add_argument("--max-retries", type=int, default=6)
+    parser.add_argument("--no-cache", action="store_true", help="bypass the summary cache")
+    parser.add_argument("--stub", action="store_true", help="use an offline stub instead of the API")
+    parser.add_argument("--stub-latency", type=float, default=0.2)
+    parser.add_argument("--stub-throttle-rate", type=float, default=0.0,
+                        help="fraction of stub calls answered with 429")
+    args = parser.parse_args()
+
+    transcripts = find_transcripts(args.source, args.pattern)
+    if not transcripts:
+        parser.error(f"No files matching {args.pattern!r} under {args.source}")
+
+    stats = BatchStats()
+    if args.stub:
+        inner = StubClient(latency=args.stub_latency, throttle_rate=args.stub_throttle_rate)
+    else:
+        # Retries are handled here, with the rate limiter, rather than inside the SDK
+        inner = get_client().with_options(max_retries=0)
+    client = RateLimitedClient(inner, TokenBucket(args.rpm), TokenBucket(args.tpm), stats,
+                               max_retries=args.max_retries)
+    # Stub summaries must never land in the shared cache
+    use_cache = not (args.no_cache or args.stub)
+
+    outcomes = {"done": 0, "skipped": 0, "failed": 0}
+    failures = []
+    started = time.perf_counter()
+    print(f"📂 {len(transcripts)} transcripts, concurrency {args.concurrency}, "
+          f"{args.rpm:g} req/min, {args.tpm:g} tokens/min", file=sys.stderr)
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        futures = {
+            executor.submit(process_transcript, path, args.source, args.out, client, use_cache): path
+            for path in transcripts
+        }
+        for finished, future in enumerate(as_completed(futures), 1):
+            path = futures[future]
+            try:
+                outcome = future.result()
+            except Exception as exc:
+                outcome = "failed"
+                print(f"✗ {path}: {type(exc).__name__}: {exc}", file=sys.stderr)
+            outcomes[outcome] += 1
+            if outcome == "failed":
+                failures.append(path)
+            if outcome == "done":
+                print(f"✓ [{finished}/{len(transcripts)}] {path}", file=sys.stderr)
+
+    report = {
+        **outcomes,
+        **{name: round(value, 2) if isinstance(value, float) else value for name, value in stats.counts.items()},
+        "elapsed_s": round(time.perf_counter() - started, 2),
+        "failures": sorted(failures),
+    }
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if outcomes["failed"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for HTML email rendering.
+
+Compares the original create_html_email_from_json (uncompiled regex, string
+concatenation, f-string template per call) with EmailRenderer.render and
+EmailRenderer.render_many on the same payloads, then a per-recipient send of
+one meeting rendered call by call against a mail-merge skeleton.
+
+Usage:
+    python benchmark_email_renderer.py
+    python benchmark_email_renderer.py --payloads 5000 --action-items 8 --repeat 5
+    python benchmark_email_renderer.py --recipients 20000
+"""
+
+import argparse
+import random
+import re
+import time
+from datetime import datetime
+from email_renderer import EmailRenderer
+from backend.app.tokens import sign_tracking_token
+
+def legacy_bold_numbers(text: str) -> str:
+    return re.sub(r'(\d+%?\.?\d*)', r'<strong>\1</strong>', text)
+
+def legacy_create_html_email_from_json(meeting_data: dict, tracking_url=None) -> str:
+    """The pre-EmailRenderer implementation, kept as the baseline"""
+ 
+    # Extract fields
+    meeting_title = meeting_data.get("meeting_title", "Meeting Summary")
+    meeting_date = meeting_data.get("meeting_date", datetime.now().strftime("%B %d, %Y"))
+    summary = legacy_bold_numbers(meeting_data.get("summary", "No summary provided."))
+    action_items = meeting_data.get("action_items", [])
+    sender_name = meeting_data.get("sender_name", "Your Name")
+    recipients = meeting_data.get("recipients", [])
+ 
+    # Build action items list
+    action_items_html = ""
+    for item in action_items:
+        person = item.get("person", "Someone")
+        task = legacy_bold_numbers(item.get("task", "No task specified"))
+        deadline = legacy_bold_numbers(item.get("deadline", "No deadline"))
+        action_items_html += f"<li><strong>{person}</strong>: {task} <em>(Due: {deadline})</em></li>"
+ 
+    # Add tracking pixel if provided
+    tracking_pixel_html = f'<img src="{tracking_url}" alt="" width="1" height="1" style="display:none;">' if tracking_url else ""
+ 
+    # HTML template (safe for Gmail/Outlook)
+    html_content = f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<style>
+  body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; padding: 20px; }}
+  h2 {{ color: #2C3E50; }}
+  ul {{ padding-left: 20px; }}
+  li {{ margin-bottom: 8px; }}
+  .footer {{ margin-top: 20px; font-size: 12px; color: #777; }}
+</style>
+</head>
+<body>
+<h2>{meeting_title}</h2>
+<p><em>Date: {meeting_date}</em></p>
+<p>Hi {", ".join(recipients) if recipients else "Team"},</p>
+ 
+  <p>{summary}</p>
+ 
+  <p><strong>Action Items:</strong></p>
+<ul>{action_items_html}</ul>
+ 
+  <p>Thanks,<br>{sender_name}</p>
+ 
+  {tracking_pixel_html}
+ 
+  <div class="footer">
+<p>This email was auto-generated from meeting data.</p>
+</div>
+</body>
+</html>"""
+    return html_content
+
+def make_payloads(count: int, action_items: int, seed: int) -> list:
+    rng = random.Random(seed)
+    return [{
+        "meeting_title": f"Q{rng.randint(1, 4)} Review #{i}",
+        "meeting_date": "March 3, 2025",
+        "summary": " ".join(
+            f"Revenue grew {rng.randint(1, 99)}% while costs fell {rng.randint(1, 50)}.{rng.randint(0, 9)} points."
+            for _ in range(6)
+        ),
+        "action_items": [
+            {"person": f"Person {j}", "task": f"Prepare report {j} covering {rng.randint(2, 20)} accounts",
+             "deadline": f"March {rng.randint(1, 28)}"}
+            for j in range(action_items)
+        ],
+        "recipients": [f"user{i}.{j}@example.com" for j in range(3)],
+        "sender_name": "Alex",
+    } for i in range(count)]
+
+def _best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML email rendering")
+    parser.add_argument("--payloads", type=int, default=2000)
+    parser.add_argument("--action-items", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per variant; the best is reported")
+    parser.add_argument("--recipients", type=int, default=5000, help="recipients in the mail-merge send")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    payloads = make_payloads(args.payloads, args.action_items, args.seed)
+    urls = [f"https://api.example.com/track/t/token{i}" for i in range(len(payloads))]
+    renderer = EmailRenderer()
+
+    # Payloads have nothing to escape, so both must produce identical HTML
+    assert renderer.render_many(payloads, urls) == [
+        legacy_create_html_email_from_json(payload, url) for payload, url in zip(payloads, urls)
+    ]
+
+    variants = {
+        "legacy create_html_email_from_json": lambda: [
+            legacy_create_html_email_from_json(payload, url) for payload, url in zip(payloads, urls)
+        ],
+        "EmailRenderer.render": lambda: [renderer.render(payload, url) for payload, url in zip(payloads, urls)],
+        "EmailRenderer.render_many": lambda: renderer.render_many(payloads, urls),
+    }
+    baseline = None
+    print(f"{args.payloads} payloads x {args.action_items} action items, best of {args.repeat}")
+    for name, fn in variants.items():
+        elapsed = _best_of(args.repeat, fn)
+        baseline = baseline or elapsed
+        print(f"  {name:<36} {elapsed * 1000:8.1f} ms  {len(payloads) / elapsed:10,.0f} emails/s  {baseline / elapsed:5.2f}x")
+
+    # One meeting sent to many recipients, each with their own greeting and pixel
+    meeting = payloads[0]
+    names = [f"Recipient {i}" for i in range(args.recipients)]
+    urls = [f"https://api.example.com/track/t/token{i}" for i in range(args.recipients)]
+    merge = renderer.mail_merge(meeting)
+    assert merge.render(names[0], urls[0]) == renderer.render({**meeting, "recipients": [names[0]]}, urls[0])
+
+    variants = {
+        "legacy, one call per recipient": lambda: [
+            legacy_create_html_email_from_json({**meeting, "recipients": [name]}, url) for name, url in zip(names, urls)
+        ],
+        "EmailRenderer.render per recipient": lambda: [
+            renderer.render({**meeting, "recipients": [name]}, url) for name, url in zip(names, urls)
+        ],
+        "mail merge": lambda: renderer.mail_merge(meeting).render_many(zip(names, urls)),
+        "mail merge + signing tokens": lambda: renderer.mail_merge(meeting).render_many(
+            (name, "https://api.example.com/track/t/" + sign_tracking_token(1, user_id, secret="benchmark-secret"))
+            for user_id, name in enumerate(names)
+        ),
+    }
+    baseline = None
+    print(f"\n1 meeting x {args.recipients} recipients, best of {args.repeat}")
+    for name, fn in variants.items():
+        elapsed = _best_of(args.repeat, fn)
+        baseline = baseline or elapsed
+        print(f"  {name:<36} {elapsed * 1000:8.1f} ms  {args.recipients / elapsed:10,.0f} emails/s  {baseline / elapsed:5.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -1,113 +1,437 @@
-import os
-from openai import AzureOpenAI
-import re
-from datetime import datetime
-from dotenv import load_dotenv
-
-# clients
-load_dotenv()
-client = AzureOpenAI(
-    api_key=os.getenv("OPENAI_API_KEY"),
-    api_version="2024-07-01-preview",
-    azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
-)
-
-def summarize_transcript(text):
-    prompt = (
-    'Summarize the following meeting transcript using the structure below:\n'
-    '{\n'
-    '  "meeting_type": "...",\n'
-    '  "meeting_title": "...",\n'
-    '  "meeting_date": "...",\n'
-    '  "summary": "...",\n'
-    '  "action_items": [\n'
-    '     {"person": "...", "task": "...", "deadline": "..."}\n'
-    '  ],\n'
-    '  "recipients": ["...", "..."]\n'
-    '}\n\n'
-    'Notes:\n'
-    '- Extract email addresses mentioned in the transcript and list them under "recipients".\n'
-    '- Ensure "meeting_title" and "meeting_date" are inferred if explicitly stated; otherwise, mark them as "Unknown".\n'
-    '- Keep the summary concise and highlight key discussion points.\n'
-    '- List action items clearly with assigned person, task.\n'
-    '- Ensure fill "deadline" follows the task if tasks do not mention about deadline, write "No information" then for "deadline"\n'
-    f"Transcript:\n{text}\n"
-)
- 
-    response = client.chat.completions.create(
-        model="GPT-4o-mini",
-        messages=[
-            {"role": "system", "content": "You are a helpful assistant specialized in summarizing meeting notes in a transcript meeting with Multilingual support. Your language response will follow the language in the transcript."},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0.1
-    )
-    return response.choices[0].message.content.strip()
- 
-
-def bold_numbers(text: str) -> str:
-    """
-    Wraps any number (or percentage) in <strong> tags.
-    E.g. 'Revenue grew 25%' -> 'Revenue grew <strong>25%</strong>'
-    """
-    return re.sub(r'(\d+%?\.?\d*)', r'<strong>\1</strong>', text)
- 
-def create_html_email_from_json(meeting_data: dict, tracking_url=None) -> str:
-    """
-    Generate a Gmail/Outlook friendly HTML email from structured meeting JSON.
-    Supports an optional tracking pixel.
-    """
- 
-    # Extract fields
-    meeting_title = meeting_data.get("meeting_title", "Meeting Summary")
-    meeting_date = meeting_data.get("meeting_date", datetime.now().strftime("%B %d, %Y"))
-    summary = bold_numbers(meeting_data.get("summary", "No summary provided."))
-    action_items = meeting_data.get("action_items", [])
-    sender_name = meeting_data.get("sender_name", "Your Name")
-    recipients = meeting_data.get("recipients", [])
- 
-    # Build action items list
-    action_items_html = ""
-    for item in action_items:
-        person = item.get("person", "Someone")
-        task = bold_numbers(item.get("task", "No task specified"))
-        deadline = bold_numbers(item.get("deadline", "No deadline"))
-        action_items_html += f"<li><strong>{person}</strong>: {task} <em>(Due: {deadline})</em></li>"
- 
-    # Add tracking pixel if provided
-    tracking_pixel_html = f'<img src="{tracking_url}" alt="" width="1" height="1" style="display:none;">' if tracking_url else ""
- 
-    # HTML template (safe for Gmail/Outlook)
-    html_content = f"""<!DOCTYPE html>
-<html>
-<head>
-<meta charset="UTF-8">
-<meta name="viewport" content="width=device-width, initial-scale=1.0">
-<style>
-  body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; padding: 20px; }}
-  h2 {{ color: #2C3E50; }}
-  ul {{ padding-left: 20px; }}
-  li {{ margin-bottom: 8px; }}
-  .footer {{ margin-top: 20px; font-size: 12px; color: #777; }}
-</style>
-</head>
-<body>
-<h2>{meeting_title}</h2>
-<p><em>Date: {meeting_date}</em></p>
-<p>Hi {", ".join(recipients) if recipients else "Team"},</p>
- 
-  <p>{summary}</p>
- 
-  <p><strong>Action Items:</strong></p>
-<ul>{action_items_html}</ul>
- 
-  <p>Thanks,<br>{sender_name}</p>
- 
-  {tracking_pixel_html}
- 
-  <div class="footer">
-<p>This email was auto-generated from meeting data.</p>
-</div>
-</body>
-</html>"""
-    return html_content
\ No newline at end of file
+import json
+import os
+import httpx
+from openai import AzureOpenAI
+import re
+from concurrent.futures import ThreadPoolExecutor
+from difflib import SequenceMatcher
+from functools import lru_cache
+from dotenv import load_dotenv
+from summary_cache import summary_cache, cache_key
+from partial_json import IncrementalJSONParser
+from email_renderer import email_renderer
+# bold_numbers used to live here; re-exported for existing importers
+from email_renderer import bold_numbers  # noqa: F401
+
+try:
+    import tiktoken
+except ImportError:  # optional; token counts fall back to an estimate
+    tiktoken = None
+
+# clients
+load_dotenv()
+
+# Tracking API that serves mailing lists with signed pixel tokens
+TRACKING_API_URL = os.getenv("TRACKING_API_URL", "http://localhost:8000")
+
+@lru_cache(maxsize=1)
+def get_client():
+    """
+    Azure OpenAI client built from the environment on first use, so the
+    module can be imported (and driven with another client) offline.
+    """
+    return AzureOpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        api_version="2024-07-01-preview",
+        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
+    )
+
+# Summarization settings
+SUMMARY_MODEL = "GPT-4o-mini"
+SUMMARY_TEMPERATURE = 0.1
+# Bump when a prompt changes so cached summaries from the old prompt are not reused
+PROMPT_VERSION = "3"
+SYSTEM_PROMPT = "You are a helpful assistant specialized in summarizing meeting notes in a transcript meeting with Multilingual support. Your language response will follow the language in the transcript."
+# Longer transcripts are split on speaker turns and summarized chunk by chunk
+SUMMARY_SINGLE_PASS_TOKENS = int(os.getenv("SUMMARY_SINGLE_PASS_TOKENS", "12000"))
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "4000"))
+SUMMARY_MAP_CONCURRENCY = int(os.getenv("SUMMARY_MAP_CONCURRENCY", "8"))
+# Action items for the same person whose tasks are at least this similar are merged
+ACTION_ITEM_SIMILARITY = 0.85
+
+SUMMARY_SCHEMA = (
+    '{\n'
+    '  "meeting_type": "...",\n'
+    '  "meeting_title": "...",\n'
+    '  "meeting_date": "...",\n'
+    '  "summary": "...",\n'
+    '  "action_items": [\n'
+    '     {"person": "...", "task": "...", "deadline": "..."}\n'
+    '  ],\n'
+    '  "recipients": ["...", "..."]\n'
+    '}\n\n'
+)
+
+SUMMARY_NOTES = (
+    'Notes:\n'
+    '- Extract email addresses mentioned in the transcript and list them under "recipients".\n'
+    '- Ensure "meeting_title" and "meeting_date" are inferred if explicitly stated; otherwise, mark them as "Unknown".\n'
+    '- Keep the summary concise and highlight key discussion points.\n'
+    '- List action items clearly with assigned person, task.\n'
+    '- Ensure fill "deadline" follows the task if tasks do not mention about deadline, write "No information" then for "deadline"\n'
+)
+
+# A line opening a speaker turn: optional [hh:mm:ss] timestamp, a short name, a colon
+SPEAKER_TURN = re.compile(r"^[ \t]*(?:\[?\d{1,2}:\d{2}(?::\d{2})?\]?[ \t]*-?[ \t]*)?[^\s:][^:\n]{0,40}:[ \t]", re.MULTILINE)
+SENTENCE_END = re.compile(r"(?<=[.!?\u3002\uff01\uff1f])\s+|\n")
+NO_DEADLINE = {"", "no information", "no deadline", "unknown", "none", "n a"}
+
+@lru_cache(maxsize=1)
+def _token_encoding():
+    return tiktoken.get_encoding("o200k_base") if tiktoken else None
+
+def count_tokens(text: str) -> int:
+    """
+    Number of model tokens in text; uses tiktoken when installed,
+    otherwise estimates about 4 characters per token.
+    """
+    encoding = _token_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return (len(text) + 3) // 4
+
+def split_speaker_turns(text: str) -> list:
+    """
+    Split a transcript into speaker turns ("Alice: ...", "[00:12:03] Bob: ...").
+    Transcripts without speaker labels are split into lines.
+    """
+    starts = [match.start() for match in SPEAKER_TURN.finditer(text)]
+    if not starts:
+        return [line for line in text.splitlines(keepends=True) if line.strip()]
+    bounds = ([0] if starts[0] else []) + starts + [len(text)]
+    return [text[a:b] for a, b in zip(bounds, bounds[1:]) if text[a:b].strip()]
+
+def _slice_tokens(text: str, max_tokens: int) -> list:
+    """Hard-slice text into consecutive pieces of max_tokens tokens each"""
+    encoding = _token_encoding()
+    if encoding is None:
+        # Same 4 characters per token as the count_tokens estimate
+        step = max_tokens * 4
+        return [text[i:i + step] for i in range(0, len(text), step)]
+    # Cut the original text at token start offsets, so a multi-byte
+    # character split across tokens is never decoded in halves
+    _, offsets = encoding.decode_with_offsets(encoding.encode(text))
+    starts = offsets[::max_tokens] + [len(text)]
+    return [text[a:b] for a, b in zip(starts, starts[1:]) if a < b]
+
+def _split_long_turn(turn: str, max_tokens: int) -> list:
+    """Break one oversized turn on sentence ends, hard-slicing sentences that still do not fit"""
+    pieces = []
+    for sentence in SENTENCE_END.split(turn):
+        if not sentence.strip():
+            continue
+        if count_tokens(sentence) <= max_tokens:
+            pieces.append(sentence + " ")
+        else:
+            pieces.extend(_slice_tokens(sentence, max_tokens))
+    return pieces
+
+def chunk_transcript(text: str, max_tokens: int = SUMMARY_CHUNK_TOKENS) -> list:
+    """
+    Pack consecutive speaker turns into chunks of at most max_tokens tokens,
+    never splitting a turn unless it is longer than a chunk on its own.
+    """
+    chunks, current, current_tokens = [], [], 0
+    for turn in split_speaker_turns(text):
+        pieces = [turn] if count_tokens(turn) <= max_tokens else _split_long_turn(turn, max_tokens)
+        for piece in pieces:
+            tokens = count_tokens(piece)
+            if current and current_tokens + tokens > max_tokens:
+                chunks.append("".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += tokens
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+def _complete(prompt: str, client, json_mode: bool = False, usage: list = None) -> str:
+    """Run one chat completion; appends the tokens it used to `usage` when given"""
+    kwargs = {"response_format": {"type": "json_object"}} if json_mode else {}
+    response = client.chat.completions.create(
+        model=SUMMARY_MODEL,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=SUMMARY_TEMPERATURE,
+        **kwargs
+    )
+    if usage is not None and getattr(response, "usage", None) is not None:
+        usage.append(response.usage.total_tokens)
+    return response.choices[0].message.content.strip()
+
+def _parse_json(content: str) -> dict:
+    # Tolerate a ```json fence around the object
+    content = content.strip()
+    if content.startswith("```"):
+        content = content.split("\n", 1)[1] if "\n" in content else ""
+        content = content.rsplit("```", 1)[0]
+    return json.loads(content)
+
+def _is_json(content: str) -> bool:
+    try:
+        _parse_json(content)
+    except ValueError:
+        return False
+    return True
+
+def _is_unknown(value) -> bool:
+    return not value or str(value).strip().lower() == "unknown"
+
+def _normalize(value) -> str:
+    return re.sub(r"\W+", " ", str(value or "")).casefold().strip()
+
+def merge_action_items(item_lists) -> list:
+    """
+    Concatenate action items from every chunk, merging duplicates: the same
+    person with a near-identical task. A merged item keeps the first known deadline.
+    """
+    merged = []
+    for items in item_lists:
+        for item in items or []:
+            person, task = _normalize(item.get("person")), _normalize(item.get("task"))
+            for existing in merged:
+                existing_task = _normalize(existing.get("task"))
+                # Tasks differing only in a number ("Task 1" / "Task 10") are distinct
+                if _normalize(existing.get("person")) != person or re.findall(r"\d+", existing_task) != re.findall(r"\d+", task):
+                    continue
+                if SequenceMatcher(None, existing_task, task).ratio() >= ACTION_ITEM_SIMILARITY:
+                    if _normalize(existing.get("deadline")) in NO_DEADLINE and _normalize(item.get("deadline")) not in NO_DEADLINE:
+                        existing["deadline"] = item["deadline"]
+                    break
+            else:
+                merged.append(dict(item))
+    return merged
+
+def merge_recipients(recipient_lists) -> list:
+    """Union of recipient addresses in first-seen order, ignoring case"""
+    seen, merged = set(), []
+    for recipients in recipient_lists:
+        for address in recipients or []:
+            key = str(address).strip().casefold()
+            if key and key not in seen:
+                seen.add(key)
+                merged.append(str(address).strip())
+    return merged
+
+def _summarize_chunk(args) -> dict:
+    index, total, chunk, client, usage = args
+    prompt = (
+        f'The following is part {index} of {total} of a long meeting transcript. '
+        'Summarize only this part using the structure below:\n'
+        + SUMMARY_SCHEMA + SUMMARY_NOTES +
+        '- Return only the JSON object.\n'
+        f"Transcript part {index} of {total}:\n{chunk}\n"
+    )
+    return _parse_json(_complete(prompt, client, json_mode=True, usage=usage))
+
+def _reduce_prompt(partials: list) -> str:
+    parts = json.dumps([
+        {key: partial.get(key) for key in ("meeting_type", "meeting_title", "meeting_date", "summary")}
+        for partial in partials
+    ], ensure_ascii=False, indent=1)
+    return (
+        'The following are summaries of consecutive parts of one meeting transcript. '
+        'Merge them into a single summary of the whole meeting using the structure below:\n'
+        '{\n'
+        '  "meeting_type": "...",\n'
+        '  "meeting_title": "...",\n'
+        '  "meeting_date": "...",\n'
+        '  "summary": "..."\n'
+        '}\n\n'
+        'Notes:\n'
+        '- Keep the summary concise and highlight key discussion points across all parts.\n'
+        '- Use the title and date stated in any part; otherwise, mark them as "Unknown".\n'
+        '- Return only the JSON object.\n'
+        f"Parts:\n{parts}\n"
+    )
+
+def _merge_reduced(reduced: dict, partials: list) -> dict:
+    """Complete the reduce output with locally merged action items and recipients"""
+    # Fall back to the first part that states a title or date
+    for key in ("meeting_title", "meeting_date"):
+        if _is_unknown(reduced.get(key)):
+            reduced[key] = next(
+                (partial[key] for partial in partials if not _is_unknown(partial.get(key))), "Unknown"
+            )
+    reduced["action_items"] = merge_action_items(partial.get("action_items") for partial in partials)
+    reduced["recipients"] = merge_recipients(partial.get("recipients") for partial in partials)
+    return reduced
+
+def _single_pass_prompt(text: str) -> str:
+    return (
+        'Summarize the following meeting transcript using the structure below:\n'
+        + SUMMARY_SCHEMA + SUMMARY_NOTES +
+        # JSON mode (used when streaming) is rejected unless the prompt asks for JSON
+        '- Return only the JSON object.\n'
+        f"Transcript:\n{text}\n"
+    )
+
+def _map_chunks(text: str, client, usage: list) -> list:
+    """Summarize the transcript's chunks concurrently; returns the partial summaries in order"""
+    chunks = chunk_transcript(text)
+    with ThreadPoolExecutor(max_workers=max(1, min(SUMMARY_MAP_CONCURRENCY, len(chunks)))) as executor:
+        return list(executor.map(
+            _summarize_chunk, [(index, len(chunks), chunk, client, usage) for index, chunk in enumerate(chunks, 1)]
+        ))
+
+def _summarize(text: str, client, usage: list) -> str:
+    if count_tokens(text) <= SUMMARY_SINGLE_PASS_TOKENS:
+        return _complete(_single_pass_prompt(text), client, usage=usage)
+
+    partials = _map_chunks(text, client, usage)
+    reduced = _parse_json(_complete(_reduce_prompt(partials), client, json_mode=True, usage=usage))
+    return json.dumps(_merge_reduced(reduced, partials), ensure_ascii=False)
+
+def _summary_cache_key(text: str):
+    # Chunking settings change the output of long transcripts, so they are part of the version
+    version = f"{PROMPT_VERSION}:{SUMMARY_SINGLE_PASS_TOKENS}:{SUMMARY_CHUNK_TOKENS}"
+    return cache_key(text, version, SUMMARY_MODEL, SUMMARY_TEMPERATURE), version
+
+def summarize_transcript(text, use_cache=True, client=None):
+    """
+    Summarize a transcript into the meeting JSON (returned as a string).
+    Short transcripts take one call; long ones are chunked on speaker turns,
+    the chunks summarized concurrently, and the partial summaries merged,
+    so latency is bounded by the slowest chunk plus one small reduce call.
+    Results are cached on disk by transcript content, prompt version, model
+    and temperature, so regenerating the same transcript skips the model.
+    `client` defaults to the Azure OpenAI client from the environment; any
+    object with a compatible chat.completions.create works.
+    """
+    key, version = _summary_cache_key(text)
+    if use_cache:
+        cached = summary_cache.get(key)
+        if cached is not None:
+            return cached
+
+    usage = []
+    summary = _summarize(text, client or get_client(), usage)
+    if use_cache and _is_json(summary):
+        summary_cache.set(key, summary, tokens=sum(usage), model=SUMMARY_MODEL, prompt_version=version)
+    return summary
+
+def _stream_complete(prompt: str, client, usage: list = None):
+    """Run one streamed chat completion in JSON mode, yielding content as it arrives"""
+    stream = client.chat.completions.create(
+        model=SUMMARY_MODEL,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=SUMMARY_TEMPERATURE,
+        response_format={"type": "json_object"},
+        stream=True
+    )
+    content, total_tokens = [], None
+    for chunk in stream:
+        if getattr(chunk, "usage", None) is not None:
+            total_tokens = chunk.usage.total_tokens
+        if chunk.choices and chunk.choices[0].delta.content:
+            content.append(chunk.choices[0].delta.content)
+            yield chunk.choices[0].delta.content
+    if usage is not None:
+        # Streams only report usage when asked to; otherwise estimate it
+        usage.append(total_tokens if total_tokens is not None else count_tokens(prompt) + count_tokens("".join(content)))
+
+def stream_summary(text, use_cache=True, client=None):
+    """
+    Summarize a transcript like summarize_transcript, but yield the meeting
+    dict as the model streams it: each value is a more complete version of
+    the previous one (title first, then the summary text growing, then action
+    items), and the last is the full summary. Long transcripts first yield
+    the merged action items and recipients once their chunks are done, then
+    stream the merged summary. Cached transcripts yield once.
+    """
+    key, version = _summary_cache_key(text)
+    if use_cache:
+        cached = summary_cache.get(key)
+        if cached is not None:
+            yield _parse_json(cached)
+            return
+
+    client = client or get_client()
+    usage = []
+    if count_tokens(text) <= SUMMARY_SINGLE_PASS_TOKENS:
+        partials, prompt = None, _single_pass_prompt(text)
+    else:
+        partials = _map_chunks(text, client, usage)
+        prompt = _reduce_prompt(partials)
+        merged = _merge_reduced({}, partials)
+        yield merged
+
+    parser = IncrementalJSONParser()
+    content, last = [], None
+    for delta in _stream_complete(prompt, client, usage=usage):
+        content.append(delta)
+        parser.feed(delta)
+        partial = parser.value()
+        if isinstance(partial, dict) and partial != last:
+            last = partial
+            if partials:
+                # Keep the fallback title/date until the reduce states its own
+                partial = {**merged, **{key: value for key, value in partial.items() if not _is_unknown(value)}}
+            yield partial
+
+    summary = "".join(content)
+    result = _parse_json(summary)
+    if partials:
+        result = _merge_reduced(result, partials)
+        summary = json.dumps(result, ensure_ascii=False)
+    if use_cache:
+        summary_cache.set(key, summary, tokens=sum(usage), model=SUMMARY_MODEL, prompt_version=version)
+    yield result
+ 
+
+def make_tracking_url(base_url: str, token: str) -> str:
+    """
+    Tracking pixel URL for a signed token from the mailing list.
+    E.g. make_tracking_url("https://api.example.com", "<token>") -> 'https://api.example.com/track/t/<token>'
+    The backend signs tokens and verifies them without a DB lookup.
+    """
+    return f"{base_url.rstrip('/')}/track/t/{token}"
+
+def load_mailing_list(meeting_id: int, statuses=None, ttl_seconds=None, api_url=None) -> list:
+    """
+    Recipients of a meeting as dicts (userId, name, email, trackingToken)
+    from the tracking API, following its pagination cursors.
+    E.g. load_mailing_list(1, ["EMAIL_CREATED"]) -> recipients not emailed yet
+    Raises httpx.HTTPError when the API is unreachable or the meeting is unknown.
+    """
+    params = {"status": list(statuses or [])}
+    if ttl_seconds is not None:
+        params["ttl"] = ttl_seconds
+    recipients = []
+    with httpx.Client(base_url=api_url or TRACKING_API_URL, timeout=30) as http:
+        while True:
+            response = http.get(f"/meetings/{meeting_id}/mailing-list", params=params)
+            response.raise_for_status()
+            recipients.extend(response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                return recipients
+            params["cursor"] = cursor
+
+def render_meeting_emails(meeting_data: dict, recipients, base_url=None) -> list:
+    """
+    Mail-merge one meeting email for many recipients: the body is rendered
+    once, and each recipient gets their own greeting and, with base_url, a
+    tracking pixel for their signed token. `recipients` are dicts with name
+    and trackingToken, as load_mailing_list returns. Returns (recipient, html) pairs.
+    """
+    recipients = list(recipients)
+    merge = email_renderer.mail_merge(meeting_data)
+    emails = merge.render_many([
+        (recipient["name"], make_tracking_url(base_url, recipient["trackingToken"]) if base_url else None)
+        for recipient in recipients
+    ])
+    return list(zip(recipients, emails))
+
+def create_html_email_from_json(meeting_data: dict, tracking_url=None) -> str:
+    """
+    Generate a Gmail/Outlook friendly HTML email from structured meeting JSON.
+    Supports an optional tracking pixel; make_tracking_url builds one from a signed token.
+    Values are HTML-escaped; use EmailRenderer.render_many for large batches.
+    """
+    return email_renderer.render(meeting_data, tracking_url)
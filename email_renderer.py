@@ -0,0 +1,245 @@
+import html
+import re
+from datetime import datetime
+from itertools import islice, repeat
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+# {{name}} marks a slot in an email template
+SLOT = re.compile(r"\{\{(\w+)\}\}")
+NUMBER = re.compile(r'(\d+%?\.?\d*)')
+# Joins many fields so they are escaped and bolded in one pass; stripped from inputs
+SEPARATOR = "\x00"
+# Payloads whose fields are joined per pass in render_many
+RENDER_BATCH_SIZE = 500
+# Slots left open in a mail-merge skeleton and filled per recipient
+RECIPIENT_SLOTS = ("greeting", "tracking_pixel")
+
+# Gmail/Outlook friendly meeting summary email
+EMAIL_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<style>
+  body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; padding: 20px; }
+  h2 { color: #2C3E50; }
+  ul { padding-left: 20px; }
+  li { margin-bottom: 8px; }
+  .footer { margin-top: 20px; font-size: 12px; color: #777; }
+</style>
+</head>
+<body>
+<h2>{{title}}</h2>
+<p><em>Date: {{date}}</em></p>
+<p>Hi {{greeting}},</p>
+ 
+  <p>{{summary}}</p>
+ 
+  <p><strong>Action Items:</strong></p>
+<ul>{{action_items}}</ul>
+ 
+  <p>Thanks,<br>{{sender_name}}</p>
+ 
+  {{tracking_pixel}}
+ 
+  <div class="footer">
+<p>This email was auto-generated from meeting data.</p>
+</div>
+</body>
+</html>"""
+
+def compile_template(template: str):
+    """
+    Split a template into its literal text and slot names once, so rendering
+    is a single join.
+    E.g. "<h2>{{title}}</h2>" -> (["<h2>", "</h2>"], ["title"])
+    """
+    parts = SLOT.split(template)
+    return parts[0::2], parts[1::2]
+
+def escape_text(value) -> str:
+    """
+    HTML-escape a value for a text node. Quotes are left alone: they are
+    safe in text, and their numeric entities would be picked up by NUMBER.
+    """
+    return html.escape(str(value), quote=False)
+
+def bold_numbers(text: str) -> str:
+    """
+    Wraps any number (or percentage) in <strong> tags.
+    E.g. 'Revenue grew 25%' -> 'Revenue grew <strong>25%</strong>'
+    """
+    # Splitting on the group avoids per-match template expansion in re.sub
+    parts = NUMBER.split(text)
+    parts[1::2] = ["<strong>" + number + "</strong>" for number in parts[1::2]]
+    return "".join(parts)
+
+def tracking_pixel_html(tracking_url: Optional[str]) -> str:
+    """Hidden 1x1 image for a tracking URL, or nothing without one"""
+    if not tracking_url:
+        return ""
+    return '<img src="' + html.escape(tracking_url) + '" alt="" width="1" height="1" style="display:none;">'
+
+def _clean(value) -> str:
+    text = str(value)
+    return text.replace(SEPARATOR, "") if SEPARATOR in text else text
+
+def escape_many(values: List) -> List[str]:
+    """escape_text over many values with a single escape call"""
+    if not values:
+        return []
+    return escape_text(SEPARATOR.join([_clean(value) for value in values])).split(SEPARATOR)
+
+def bold_numbers_many(texts: List[str]) -> List[str]:
+    """bold_numbers over many strings with a single regex pass"""
+    if not texts:
+        return []
+    return bold_numbers(SEPARATOR.join(texts)).split(SEPARATOR)
+
+class EmailRenderer:
+    """
+    Renders meeting summary emails from a template compiled once into
+    literal parts and slots. Every inserted value is HTML-escaped. The
+    fields of a batch of payloads are escaped and number-bolded in one pass
+    each, and output is built with list joins.
+    """
+
+    def __init__(self, template: str = EMAIL_TEMPLATE):
+        literals, slots = compile_template(template)
+        self.head = literals[0]
+        self.parts = list(zip(slots, literals[1:]))
+
+    @staticmethod
+    def _collect(meeting_data: dict, plain: list, bold: list):
+        """Append a payload's raw field values to the batch; returns its action item and recipient counts"""
+        get = meeting_data.get
+        if "meeting_date" in meeting_data:
+            meeting_date = meeting_data["meeting_date"]
+        else:
+            meeting_date = datetime.now().strftime("%B %d, %Y")
+        action_items = get("action_items", [])
+        recipients = get("recipients", [])
+        plain.append(get("meeting_title", "Meeting Summary"))
+        plain.append(meeting_date)
+        plain.append(get("sender_name", "Your Name"))
+        plain.extend([item.get("person", "Someone") for item in action_items])
+        plain.extend(recipients)
+        bold.append(get("summary", "No summary provided."))
+        for item in action_items:
+            bold.append(item.get("task", "No task specified"))
+            bold.append(item.get("deadline", "No deadline"))
+        return len(action_items), len(recipients)
+
+    def _fields_batch(self, payloads: List[dict], tracking_urls: Iterable) -> Iterator[dict]:
+        plain, bold, shapes = [], [], []
+        for payload in payloads:
+            shapes.append(self._collect(payload, plain, bold))
+        plain = iter(escape_many(plain))
+        bold = iter(bold_numbers_many(escape_many(bold)))
+
+        for (item_count, recipient_count), tracking_url in zip(shapes, tracking_urls):
+            title, meeting_date, sender_name = next(plain), next(plain), next(plain)
+            persons = list(islice(plain, item_count))
+            recipients = list(islice(plain, recipient_count))
+            summary = next(bold)
+            tasks = list(islice(bold, 2 * item_count))
+            yield {
+                "title": title,
+                "date": meeting_date,
+                "greeting": ", ".join(recipients) if recipients else "Team",
+                "summary": summary,
+                "action_items": "".join([
+                    "<li><strong>" + person + "</strong>: " + task + " <em>(Due: " + deadline + ")</em></li>"
+                    for person, task, deadline in zip(persons, tasks[0::2], tasks[1::2])
+                ]),
+                "sender_name": sender_name,
+                "tracking_pixel": tracking_pixel_html(tracking_url),
+            }
+
+    def fields(self, meeting_data: dict, tracking_url: Optional[str] = None) -> dict:
+        """Escaped slot values for one meeting payload"""
+        return next(self._fields_batch([meeting_data], [tracking_url]))
+
+    def fill(self, values: dict) -> str:
+        """Join the template with already-escaped slot values"""
+        out = [self.head]
+        append = out.append
+        for slot, literal in self.parts:
+            append(values[slot])
+            append(literal)
+        return "".join(out)
+
+    def render(self, meeting_data: dict, tracking_url: Optional[str] = None) -> str:
+        """Render one email"""
+        return self.fill(self.fields(meeting_data, tracking_url))
+
+    def render_many(self, payloads: Iterable[dict], tracking_urls: Optional[Iterable[str]] = None) -> List[str]:
+        """Render a batch of payloads, optionally with one tracking URL each"""
+        payloads = list(payloads)
+        tracking_urls = iter(tracking_urls) if tracking_urls is not None else repeat(None)
+        fill = self.fill
+        rendered = []
+        for start in range(0, len(payloads), RENDER_BATCH_SIZE):
+            batch = payloads[start:start + RENDER_BATCH_SIZE]
+            rendered.extend([fill(values) for values in self._fields_batch(batch, islice(tracking_urls, len(batch)))])
+        return rendered
+
+    def mail_merge(self, meeting_data: dict) -> "MailMerge":
+        """
+        Render everything but the per-recipient slots (greeting and tracking
+        pixel) once, for cheap per-recipient rendering of the same meeting.
+        """
+        values = self.fields(meeting_data)
+        head, parts = None, []
+        open_slot, current = None, [self.head]
+        for slot, literal in self.parts:
+            if slot in RECIPIENT_SLOTS:
+                if open_slot is None:
+                    head = "".join(current)
+                else:
+                    parts.append((open_slot, "".join(current)))
+                open_slot, current = slot, [literal]
+            else:
+                current.append(values[slot])
+                current.append(literal)
+        if open_slot is None:
+            head = "".join(current)
+        else:
+            parts.append((open_slot, "".join(current)))
+        return MailMerge(head, parts)
+
+class MailMerge:
+    """
+    A meeting email rendered once into a skeleton of static segments with
+    per-recipient slots between them. Rendering for a recipient escapes
+    their name and joins a handful of strings.
+    """
+
+    def __init__(self, head: str, parts: List[Tuple[str, str]]):
+        self.head = head
+        self.parts = parts
+
+    def _fill(self, greeting: str, tracking_pixel: str) -> str:
+        out = [self.head]
+        append = out.append
+        for slot, segment in self.parts:
+            append(greeting if slot == "greeting" else tracking_pixel)
+            append(segment)
+        return "".join(out)
+
+    def render(self, name: Optional[str] = None, tracking_url: Optional[str] = None) -> str:
+        """Email for one recipient, greeted by name ("Team" without one)"""
+        return self._fill(escape_text(name) if name else "Team", tracking_pixel_html(tracking_url))
+
+    def render_many(self, recipients: Iterable[Tuple[Optional[str], Optional[str]]]) -> List[str]:
+        """Emails for many (name, tracking_url) pairs"""
+        recipients = list(recipients)
+        names = escape_many([name or "" for name, _ in recipients])
+        fill = self._fill
+        return [
+            fill(name or "Team", tracking_pixel_html(tracking_url))
+            for name, (_, tracking_url) in zip(names, recipients)
+        ]
+
+# Shared renderer for the default template
+email_renderer = EmailRenderer()
@@ -1,13 +1,36 @@
 
-import json
 import os
+import time
 import streamlit as st
 from azure.communication.email import EmailClient
-from email_content import summarize_transcript, create_html_email_from_json
+from email_content import stream_summary, create_html_email_from_json
+from summary_cache import summary_cache
 from dotenv import load_dotenv
 
 
 load_dotenv()
+
+# Minimum seconds between preview redraws while a summary streams in
+PREVIEW_REFRESH_SECONDS = 0.1
+
+def render_partial_summary(summary: dict) -> str:
+    """
+    Markdown preview of a meeting summary that may still be streaming;
+    fields that have not arrived yet are shown as placeholders.
+    """
+    lines = [f"### {summary.get('meeting_title') or '…'}"]
+    if summary.get("meeting_date"):
+        lines.append(f"*Date: {summary['meeting_date']}*")
+    lines.append(summary.get("summary") or "…")
+    action_items = summary.get("action_items") or []
+    if action_items:
+        lines.append("**Action Items:**")
+        lines.append("\n".join(
+            f"- **{item.get('person', '…')}**: {item.get('task', '…')} *(Due: {item.get('deadline', '…')})*"
+            for item in action_items if isinstance(item, dict)
+        ))
+    return "\n\n".join(lines)
+
 email_client = EmailClient.from_connection_string(os.getenv("ACS_CONNECTION_STRING"))
 
 st.set_page_config(page_title="AI Support Email Demo")
@@ -18,17 +41,28 @@ recipient = st.text_input("Recipient email", value=os.getenv("RECIPIENT_EMAIL"))
 subject   = st.text_input("Email subject", value="MOM - Meeting Summary")
 query     = st.file_uploader("Upload a transcript file", type=["txt"])
 
+cache_stats = summary_cache.stats()
+st.sidebar.caption(
+    f"Summary cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+    f"{cache_stats['saved_tokens']} tokens saved, {cache_stats['entries']} entries"
+)
+
 # 1) GENERATE
 if st.button("🧠 Generate Reply"):
     if not query:
         st.error("Enter a customer query first.")
     else:
-        with st.spinner("Generating…"):
-            transcript_text = query.read().decode("utf-8")
-            summary = summarize_transcript(transcript_text)
-            summary_dict = json.loads(summary)
-            st.session_state["draft"] = create_html_email_from_json(summary_dict)
-            # st.session_state["draft"] = summary
+        transcript_text = query.read().decode("utf-8")
+        preview = st.empty()
+        preview.caption("Generating…")
+        # Render the summary as it streams in, then build the full email from the final one
+        summary_dict, last_render = {}, 0.0
+        for summary_dict in stream_summary(transcript_text):
+            if time.monotonic() - last_render >= PREVIEW_REFRESH_SECONDS:
+                preview.markdown(render_partial_summary(summary_dict))
+                last_render = time.monotonic()
+        preview.empty()
+        st.session_state["draft"] = create_html_email_from_json(summary_dict)
 
 # 2) PREVIEW & EDIT
 if "draft" in st.session_state:
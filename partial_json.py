@@ -0,0 +1,154 @@
+import json
+from typing import Any, Optional
+
+WHITESPACE = " \t\r\n"
+CLOSERS = {"{": "}", "[": "]"}
+
+class IncrementalJSONParser:
+    """
+    Parses a JSON document as it streams in and returns the largest valid
+    value seen so far. Each fed character is scanned once; the scanner
+    remembers the last point where the document was complete up to a
+    finished member, so a snapshot is that prefix with its open containers
+    closed. A string value that is still streaming is included as far as
+    it has arrived, so long text fields grow progressively.
+
+    E.g. feeding '{"title": "Q3", "summary": "Reven' gives
+    {"title": "Q3", "summary": "Reven"}
+
+    Text before the first '{' or '[' (such as a ```json fence) and after
+    the document ends is ignored.
+    """
+
+    def __init__(self):
+        self._buffer = []
+        self._length = 0
+        self._started = False
+        self._offset = 0
+        self.done = False
+        # One frame per open container: [opener, state]
+        # object states: key, colon, value, comma; array states: value, comma
+        self._stack = []
+        self._in_string = False
+        self._string_is_key = False
+        self._string_safe_end = 0
+        self._escape = False
+        self._unicode_remaining = 0
+        self._token_start = None
+        # (index, closers) of the last complete prefix
+        self._safe = None
+        self._snapshot_at = -1
+        self._snapshot = None
+
+    def _closers(self) -> str:
+        return "".join(CLOSERS[opener] for opener, _ in reversed(self._stack))
+
+    def _mark_safe(self, index: int):
+        self._safe = (index, self._closers())
+
+    def _value_done(self, index: int):
+        if not self._stack:
+            self.done = True
+            self._safe = (index, "")
+            return
+        self._stack[-1][1] = "comma"
+        self._mark_safe(index)
+
+    def _end_token(self, index: int):
+        self._token_start = None
+        self._value_done(index)
+
+    def feed(self, text: str):
+        """Append streamed text"""
+        start = self._length
+        self._buffer.append(text)
+        self._length += len(text)
+        if self.done:
+            return
+        for index, char in enumerate(text, start):
+            if self.done:
+                break
+            if not self._started:
+                if char in "{[":
+                    self._started = True
+                    # Anything before the document is dropped from the snapshot
+                    self._offset = index
+                    self._stack.append([char, "key" if char == "{" else "value"])
+                    self._mark_safe(index + 1)
+                continue
+            self._scan(char, index)
+
+    def _scan(self, char: str, index: int):
+        if self._in_string:
+            if self._unicode_remaining:
+                self._unicode_remaining -= 1
+                if not self._unicode_remaining:
+                    self._string_safe_end = index + 1
+            elif self._escape:
+                self._escape = False
+                if char == "u":
+                    self._unicode_remaining = 4
+                else:
+                    self._string_safe_end = index + 1
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                if self._string_is_key:
+                    self._stack[-1][1] = "colon"
+                else:
+                    self._value_done(index + 1)
+            else:
+                self._string_safe_end = index + 1
+            return
+
+        if self._token_start is not None:
+            if char not in WHITESPACE and char not in ",]}":
+                return
+            self._end_token(index)
+            if self.done:
+                return
+
+        if char in WHITESPACE:
+            return
+        frame = self._stack[-1]
+        opener, state = frame
+        if char == '"':
+            self._in_string = True
+            self._string_is_key = opener == "{" and state == "key"
+            self._string_safe_end = index + 1
+        elif char == ":" and state == "colon":
+            frame[1] = "value"
+        elif char == ",":
+            frame[1] = "key" if opener == "{" else "value"
+        elif char in "}]":
+            self._stack.pop()
+            self._value_done(index + 1)
+        elif char in "{[":
+            self._stack.append([char, "key" if char == "{" else "value"])
+            self._mark_safe(index + 1)
+        else:
+            # Number or literal; complete only once a delimiter follows it
+            self._token_start = index
+
+    def value(self) -> Optional[Any]:
+        """Best-effort value of everything fed so far; None before the document starts"""
+        if not self._started:
+            return None
+        if self._snapshot_at == self._length:
+            return self._snapshot
+        text = "".join(self._buffer)
+        self._buffer = [text]
+        if self._in_string and not self._string_is_key:
+            # Close the partial string value, cutting any dangling escape
+            candidate = text[self._offset:self._string_safe_end] + '"' + self._closers()
+        else:
+            index, closers = self._safe
+            candidate = text[self._offset:index] + closers
+        try:
+            self._snapshot = json.loads(candidate)
+        except ValueError:
+            index, closers = self._safe
+            self._snapshot = json.loads(text[self._offset:index] + closers)
+        self._snapshot_at = self._length
+        return self._snapshot
@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# On-disk transcript summary cache configuration
+SUMMARY_CACHE_ENABLED = os.getenv("SUMMARY_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+SUMMARY_CACHE_DIR = os.getenv("SUMMARY_CACHE_DIR", ".summary_cache")
+SUMMARY_CACHE_MAX_BYTES = int(os.getenv("SUMMARY_CACHE_MAX_BYTES", str(100 * 1024 * 1024)))
+
+def normalize_transcript(text: str) -> str:
+    """
+    Canonical form used for hashing: NFC, LF line endings, no trailing
+    whitespace, at most one blank line in a row.
+    E.g. "Alice: hi  \\r\\n\\r\\n\\r\\nBob: yo" -> "Alice: hi\\n\\nBob: yo"
+    """
+    text = unicodedata.normalize("NFC", text).replace("\r\n", "\n").replace("\r", "\n")
+    lines, blank = [], False
+    for line in text.split("\n"):
+        line = line.rstrip()
+        if not line and blank:
+            continue
+        blank = not line
+        lines.append(line)
+    return "\n".join(lines).strip()
+
+def cache_key(text: str, prompt_version: str, model: str, temperature: float) -> str:
+    """Content address of a summary: the normalized transcript plus everything that shapes the output"""
+    digest = hashlib.sha256()
+    for part in (prompt_version, model, repr(float(temperature)), normalize_transcript(text)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+class SummaryCache:
+    """
+    Summaries stored one JSON file per key under directory/<key[:2]>/<key>.json.
+    Files are written to a temporary name and renamed into place, so readers
+    never see a partial entry. Total size is bounded by evicting the least
+    recently used entries; a file's mtime is its last use, so recency
+    survives restarts.
+    """
+
+    def __init__(self, directory: str = SUMMARY_CACHE_DIR, max_bytes: int = SUMMARY_CACHE_MAX_BYTES,
+                 enabled: bool = SUMMARY_CACHE_ENABLED):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._index: Optional["OrderedDict[str, int]"] = None
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_tokens = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _load_index(self):
+        # key -> size in bytes, least recently used first
+        if self._index is not None:
+            return
+        entries = []
+        if os.path.isdir(self.directory):
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    if not name.endswith(".json"):
+                        continue
+                    try:
+                        stat = os.stat(os.path.join(root, name))
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, name[:-5], stat.st_size))
+        entries.sort()
+        self._index = OrderedDict((key, size) for _, key, size in entries)
+        self._bytes = sum(self._index.values())
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached summary for a key, counting hits, misses and saved tokens"""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            entry = None
+        except (OSError, ValueError):
+            # Unreadable or corrupt entry; drop it and recompute
+            self._discard(key)
+            entry = None
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.saved_tokens += entry.get("tokens", 0)
+            self._load_index()
+            if key in self._index:
+                self._index.move_to_end(key)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry["summary"]
+
+    def set(self, key: str, summary: str, tokens: int = 0, **metadata):
+        """Store a summary atomically, with the tokens it cost to produce"""
+        if not self.enabled:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        body = json.dumps({
+            "key": key,
+            "created_at": time.time(),
+            "tokens": tokens,
+            **metadata,
+            "summary": summary,
+        }, ensure_ascii=False).encode("utf-8")
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(body)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        with self._lock:
+            self._load_index()
+            self._bytes += len(body) - self._index.pop(key, 0)
+            self._index[key] = len(body)
+            self.writes += 1
+            self._evict()
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+            try:
+                os.unlink(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def _discard(self, key: str):
+        try:
+            os.unlink(self._path(key))
+        except OSError:
+            pass
+        with self._lock:
+            if self._index is not None and key in self._index:
+                self._bytes -= self._index.pop(key)
+
+    def clear(self):
+        """Delete every cached summary"""
+        with self._lock:
+            self._load_index()
+            for key in list(self._index):
+                try:
+                    os.unlink(self._path(key))
+                except FileNotFoundError:
+                    pass
+            self._index.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Current cache counters"""
+        with self._lock:
+            self._load_index()
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "directory": self.directory,
+                "entries": len(self._index),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "saved_tokens": self.saved_tokens,
+                "writes": self.writes,
+                "evictions": self.evictions,
+            }
+
+# Shared cache used by summarize_transcript
+summary_cache = SummaryCache()